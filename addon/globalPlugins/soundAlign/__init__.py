@@ -4,14 +4,13 @@
 
 import sys
 import os
-import shutil
 import threading
 import types
 import math
 import array
 import time
-import json
 import re
+from bisect import bisect_right
 import queueHandler
 import eventHandler
 from queue import Queue
@@ -43,6 +42,7 @@ plugin_dir = os.path.dirname(__file__)
 if plugin_dir not in sys.path:
 	sys.path.insert(0, plugin_dir)
 
+from .settingsStore import SettingsStore
 from .soundUtils import (
 	SoundProcessor,
 	LEFT,
@@ -54,10 +54,12 @@ from .soundUtils import (
 	PROGRESS_INDICATOR,
 	ADDON_BEEP,
 	CENTER,
-	TONE_SINE,
-	TONE_SAWTOOTH,
-	TONE_TRIANGLE,
-	TONE_SQUARE
+	FADE_ALGORITHMS,
+	OUTPUT_CALLBACK,
+	OUTPUT_MODES,
+	PERCENT_RESOLUTIONS,
+	SoundSettings,
+	quantize_percent
 )
 
 addonHandler.initTranslation()
@@ -78,14 +80,34 @@ DEFAULT_SETTINGS = {
 	"maxFrequency": 1760,
 	"speechPercentageInterval": 10,
 	"beepPercentageInterval": 5,
+	"progressResolution": 1.0,
 	"timeBasedInterval": 0,
 	"mixedMode": False,
 	"smoothPanning": True,
-	"masterVolume": 100
+	"overlapProgressTones": False,
+	"masterVolume": 100,
+	"outputMode": OUTPUT_CALLBACK
 }
 
 DEFAULT_ADDON_BEEP_FREQ = 1000
 
+PROGRESS_STATE_LIMIT = 32
+
+ERROR_BEEP = (600, 300)
+PROGRESS_DONE_BEEP = (2000, 150)
+KNOWN_BEEPS = (ERROR_BEEP, PROGRESS_DONE_BEEP)
+PROGRESS_MIN_HZ = 110
+PROGRESS_MAX_HZ = 2000
+PROGRESS_MIN_LENGTH = 15
+PROGRESS_MAX_LENGTH = 60
+ADDON_BEEP_SPLIT_HZ = 1000
+
+# Band edges for the compiled routing table, taken from the getSoundType thresholds; the
+# inclusive upper limits start their band just above the limit. Every (hz, length) falls
+# in exactly one band pair, so routing never has to compile a route on the beep path.
+ROUTE_HZ_BOUNDS = (PROGRESS_MIN_HZ, ADDON_BEEP_SPLIT_HZ, math.nextafter(PROGRESS_MAX_HZ, math.inf))
+ROUTE_LENGTH_BOUNDS = (PROGRESS_MIN_LENGTH, math.nextafter(PROGRESS_MAX_LENGTH, math.inf))
+
 WAVEFORM_NAMES = {
 	0: _("Sine"),
 	1: _("Triangle"),
@@ -94,28 +116,6 @@ WAVEFORM_NAMES = {
 	4: _("Original Tone Beep")
 }
 
-WAVEFORM_MAP = {
-	0: TONE_SINE,
-	1: TONE_TRIANGLE,
-	2: TONE_SAWTOOTH,
-	3: TONE_SQUARE
-}
-
-FADE_ALGORITHMS = [
-	"cosine",
-	"gaussian",
-	"linear",
-	"exponential",
-	"logarithmic",
-	"s_curve",
-	"sine",
-	"quarter_sine",
-	"half_sine",
-	"square_root",
-	"cubic_root",
-	"quadratic"
-]
-
 FADE_NAMES = {
 	"cosine": _("Cosine"),
 	"gaussian": _("Gaussian"),
@@ -131,74 +131,46 @@ FADE_NAMES = {
 	"quadratic": _("Quadratic")
 }
 
+OUTPUT_MODE_NAMES = {
+	"callback": _("Callback (lowest latency)"),
+	"blocking": _("Blocking (compatibility)")
+}
+
+PROGRESSBAR_ROLE = controlTypes.Role.PROGRESSBAR if hasattr(controlTypes, "Role") else controlTypes.ROLE_PROGRESSBAR
+
 try:
 	import pyaudiowpatch as pyaudio
 except ImportError as e:
 	log.error(f"SoundAlign: Failed to import pyaudiowpatch: {e}")
 	pyaudio = None
 
+_settingsStore = None
+
+def getSettingsStore():
+	global _settingsStore
+	if _settingsStore is None:
+		configPath = config.getUserDefaultConfigPath()
+		_settingsStore = SettingsStore(
+			os.path.join(configPath, "ChaiChaimee", "soundAlign.json"),
+			DEFAULT_SETTINGS,
+			legacy_path=os.path.join(configPath, "soundAlign.json"),
+			on_error=reportSaveError
+		)
+	return _settingsStore
+
+def reportSaveError(error):
+	wx.CallAfter(
+		gui.messageBox,
+		_("Failed to save settings. Please check permissions or config path."),
+		_("Save Error"),
+		wx.OK | wx.ICON_ERROR
+	)
+
 def loadSettings():
-	old_settings_path = os.path.join(config.getUserDefaultConfigPath(), "soundAlign.json")
-	new_settings_path = os.path.join(config.getUserDefaultConfigPath(), "ChaiChaimee", "soundAlign.json")
-	settings = DEFAULT_SETTINGS.copy()
-	
-	if os.path.exists(new_settings_path):
-		settings_path = new_settings_path
-		migrate = False
-	elif os.path.exists(old_settings_path):
-		settings_path = old_settings_path
-		migrate = True
-	else:
-		settings_path = None
-		migrate = False
-
-	if settings_path and os.path.exists(settings_path):
-		try:
-			with open(settings_path, "r", encoding="utf-8") as f:
-				userSettings = json.load(f)
-			for key in settings:
-				if key in userSettings:
-					settings[key] = userSettings[key]
-			if migrate:
-				try:
-					os.makedirs(os.path.dirname(new_settings_path), exist_ok=True)
-					shutil.move(old_settings_path, new_settings_path)
-					log.info(f"SoundAlign: Migrated settings from {old_settings_path} to {new_settings_path}")
-				except Exception as e:
-					log.error(f"SoundAlign: Failed to migrate settings to new location: {e}")
-		except json.JSONDecodeError as e:
-			log.error(f"SoundAlign: Error loading settings: JSON file is corrupted or empty ({e}). Using default settings.")
-			saveSettings(DEFAULT_SETTINGS)
-		except Exception as e:
-			log.error(f"SoundAlign: Error loading settings: {e}")
-	else:
-		saveSettings(settings)
-	
-	return settings
+	return getSettingsStore().load()
 
 def saveSettings(settings):
-	settingsPath = os.path.join(config.getUserDefaultConfigPath(), "ChaiChaimee", "soundAlign.json")
-	try:
-		os.makedirs(os.path.dirname(settingsPath), exist_ok=True)
-		if not os.access(os.path.dirname(settingsPath), os.W_OK):
-			log.error(f"SoundAlign: No write permission for {os.path.dirname(settingsPath)}")
-			gui.messageBox(
-				_("Cannot save settings. No write permission for configuration directory."),
-				_("Save Error"),
-				wx.OK | wx.ICON_ERROR
-			)
-			return False
-		with open(settingsPath, "w", encoding="utf-8") as f:
-			json.dump(settings, f, ensure_ascii=False, indent=4)
-		return True
-	except Exception as e:
-		log.error(f"SoundAlign: Error saving settings: {e}")
-		gui.messageBox(
-			_("Failed to save settings. Please check permissions or config path."),
-			_("Save Error"),
-			wx.OK | wx.ICON_ERROR
-		)
-		return False
+	getSettingsStore().update(settings)
 
 class SoundAlignSettingsPanel(gui.settingsDialogs.SettingsPanel):
 	title = _("SoundAlign")
@@ -316,12 +288,23 @@ class SoundAlignSettingsPanel(gui.settingsDialogs.SettingsPanel):
 		self.beepIntervalControl = sHelper.addLabeledControl(
 			_("Beep announcement interval:"),
 			wx.Choice,
-			choices=[_(interval) for interval in beep_intervals]
+			choices=[_("Every change")] + [_(interval) for interval in beep_intervals]
 		)
 		beep_interval = self.settings.get("beepPercentageInterval", 5)
-		beep_index = {1: 0, 2: 1, 5: 2, 10: 3}.get(beep_interval, 2)
+		beep_index = {0: 0, 1: 1, 2: 2, 5: 3, 10: 4}.get(beep_interval, 3)
 		self.beepIntervalControl.SetSelection(beep_index)
 
+		self.resolutionControl = sHelper.addLabeledControl(
+			_("Progress resolution:"),
+			wx.Choice,
+			choices=[f"{resolution:g}%" for resolution in PERCENT_RESOLUTIONS]
+		)
+		resolution = self.settings.get("progressResolution", 1.0)
+		if resolution in PERCENT_RESOLUTIONS:
+			self.resolutionControl.SetSelection(PERCENT_RESOLUTIONS.index(resolution))
+		else:
+			self.resolutionControl.SetSelection(0)
+
 		self.timeBasedControl = sHelper.addLabeledControl(
 			_("Time-based announcement (seconds, 0=disabled):"),
 			wx.SpinCtrl,
@@ -333,15 +316,45 @@ class SoundAlignSettingsPanel(gui.settingsDialogs.SettingsPanel):
 		self.mixedModeControl = sHelper.addItem(wx.CheckBox(self, label=_("Mixed mode (speech + beep)")))
 		self.mixedModeControl.SetValue(self.settings.get("mixedMode", False))
 
-		self.smoothPanningControl = sHelper.addItem(wx.CheckBox(self, label=_("Smooth panning (reduces cracking)")))
+		self.smoothPanningControl = sHelper.addItem(
+			wx.CheckBox(self, label=_("Smooth panning (one continuous gliding progress tone)"))
+		)
 		self.smoothPanningControl.SetValue(self.settings.get("smoothPanning", True))
 
+		self.overlapProgressControl = sHelper.addItem(
+			wx.CheckBox(self, label=_("Overlap consecutive progress tones (crossfade)"))
+		)
+		self.overlapProgressControl.SetValue(self.settings.get("overlapProgressTones", False))
+
+		self.outputModeControl = sHelper.addLabeledControl(
+			_("Audio output mode:"),
+			wx.Choice,
+			choices=[OUTPUT_MODE_NAMES[mode] for mode in OUTPUT_MODES]
+		)
+		current_mode = self.settings.get("outputMode", OUTPUT_CALLBACK)
+		if current_mode in OUTPUT_MODES:
+			self.outputModeControl.SetSelection(OUTPUT_MODES.index(current_mode))
+		else:
+			self.outputModeControl.SetSelection(0)
+
 		self.minFrequencyControl.Bind(wx.EVT_CHOICE, self.onFrequencyChange)
 		self.maxFrequencyControl.Bind(wx.EVT_CHOICE, self.onFrequencyChange)
+		self.smoothPanningControl.Bind(wx.EVT_CHECKBOX, self.onSmoothPanningChange)
+		self.updateDiscreteToneControls()
 
 		testBtn = sHelper.addItem(wx.Button(self, label=_("Test All Settings")))
 		testBtn.Bind(wx.EVT_BUTTON, self.onTest)
 
+	def onSmoothPanningChange(self, evt):
+		self.updateDiscreteToneControls()
+		evt.Skip()
+
+	def updateDiscreteToneControls(self):
+		# The gliding tone has no per-tone fade or overlap, so these only apply to discrete tones.
+		discrete = not self.smoothPanningControl.GetValue()
+		self.fadeAlgorithmControl.Enable(discrete)
+		self.overlapProgressControl.Enable(discrete)
+
 	def onFrequencyChange(self, evt):
 		min_freq_index = self.minFrequencyControl.GetSelection()
 		max_freq_index = self.maxFrequencyControl.GetSelection()
@@ -424,22 +437,27 @@ class SoundAlignSettingsPanel(gui.settingsDialogs.SettingsPanel):
 		speech_intervals = {0: 1, 1: 2, 2: 5, 3: 10}
 		settings["speechPercentageInterval"] = speech_intervals.get(self.speechIntervalControl.GetSelection(), 10)
 		
-		beep_intervals = {0: 1, 1: 2, 2: 5, 3: 10}
+		beep_intervals = {0: 0, 1: 1, 2: 2, 3: 5, 4: 10}
 		settings["beepPercentageInterval"] = beep_intervals.get(self.beepIntervalControl.GetSelection(), 5)
+		resolution_index = self.resolutionControl.GetSelection()
+		if 0 <= resolution_index < len(PERCENT_RESOLUTIONS):
+			settings["progressResolution"] = PERCENT_RESOLUTIONS[resolution_index]
+		else:
+			settings["progressResolution"] = 1.0
 		
 		settings["timeBasedInterval"] = self.timeBasedControl.GetValue()
 		settings["mixedMode"] = self.mixedModeControl.GetValue()
 		settings["smoothPanning"] = self.smoothPanningControl.GetValue()
-		
-		if saveSettings(settings):
-			if hasattr(GlobalPlugin, 'instance') and GlobalPlugin.instance:
-				GlobalPlugin.instance.applySettings()
+		settings["overlapProgressTones"] = self.overlapProgressControl.GetValue()
+		mode_index = self.outputModeControl.GetSelection()
+		if 0 <= mode_index < len(OUTPUT_MODES):
+			settings["outputMode"] = OUTPUT_MODES[mode_index]
 		else:
-			gui.messageBox(
-				_("Failed to save settings. Please check permissions or config path."),
-				_("Save Error"),
-				wx.OK | wx.ICON_ERROR
-			)
+			settings["outputMode"] = OUTPUT_CALLBACK
+		
+		saveSettings(settings)
+		if hasattr(GlobalPlugin, 'instance') and GlobalPlugin.instance:
+			GlobalPlugin.instance.applySettings()
 
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	instance = None
@@ -449,6 +467,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		super(GlobalPlugin, self).__init__()
 		GlobalPlugin.instance = self
 		self.settings = loadSettings()
+		self.soundSettings = SoundSettings(self.settings)
+		self.routes = self.compileRoutes()
 		
 		self.originalBeep = tones.beep
 		self.originalWinsoundBeep = winsound.Beep if winsound is not None else None
@@ -456,7 +476,11 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		self.sound_processor = None
 		if pyaudio:
 			try:
-				self.sound_processor = SoundProcessor(self, pyaudio)
+				self.sound_processor = SoundProcessor(
+					self,
+					pyaudio,
+					output_mode=self.settings.get("outputMode", OUTPUT_CALLBACK)
+				)
 			except Exception as e:
 				log.error(f"SoundAlign: Failed to initialize SoundProcessor: {e}")
 		
@@ -464,6 +488,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		self.last_beep_percent = -1
 		self.last_time_announced = 0
 		self.last_progress_object = None
+		self.progressStates = {}
 		
 		self.last_gesture_time = 0
 		self.gesture_count = 0
@@ -500,55 +525,109 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			log.error(f"SoundAlign: Error setting up hooks: {e}")
 
 	def safeBeep(self, hz, length, left=50, right=50, *args, **kwargs):
-		if not self.settings.get("isActive", True):
+		start = time.perf_counter()
+		try:
+			return self.handleBeep(hz, length, left, right, *args, **kwargs)
+		finally:
+			if self.sound_processor:
+				self.sound_processor.caller_time.add(time.perf_counter() - start)
+
+	def handleBeep(self, hz, length, left=50, right=50, *args, **kwargs):
+		settings = self.soundSettings
+		if not settings.active:
 			return self.originalBeep(hz, length, left, right, *args, **kwargs)
 		
-		soundType = self.getSoundType(hz, length)
-		direction = self.getDirection(soundType, hz)
+		soundType, direction, leftVol, rightVol = self.routeBeep(hz, length)
 		
 		if soundType == PROGRESS_INDICATOR:
-			if self.settings.get("waveformType") == 4:
-				obj = api.getFocusObject()
-				percent = self.sound_processor.get_progress_percent(obj) if self.sound_processor else None
+			if settings.waveform_type == 4:
+				obj, percent = self.getBeepProgress()
 				
 				if not isinstance(percent, (int, float)) or percent < 0:
-					if self.settings.get("maxFrequency") > self.settings.get("minFrequency"):
-						percent = (hz - self.settings.get("minFrequency")) / (self.settings.get("maxFrequency") - self.settings.get("minFrequency")) * 100
+					if settings.frequency_span > 0:
+						percent = (hz - settings.min_frequency) / settings.frequency_span * 100
 					else:
 						percent = 50
-					percent = max(0, min(100, percent))
+					percent = quantize_percent(percent, settings.percent_resolution)
 				
-				self.handleProgressAnnouncements(percent, obj)
+				if not self.handleProgressAnnouncements(percent, obj):
+					return
 				
 				pan_pos = percent / 100.0 if direction == LEFT_TO_RIGHT else 1.0 - (percent / 100.0) if direction == RIGHT_TO_LEFT else 0.5
 				leftVol_dynamic = (1.0 - pan_pos) * 100
 				rightVol_dynamic = pan_pos * 100
-				master = self.settings.get("masterVolume", 100) / 100.0
+				master = settings.master_volume
 				self.originalBeep(hz, length, left=int(leftVol_dynamic * master), right=int(rightVol_dynamic * master))
 			else:
-				obj = api.getFocusObject()
-				percent = self.sound_processor.get_progress_percent(obj) if self.sound_processor else None
+				obj, percent = self.getBeepProgress()
 				
 				if percent is None:
-					percent = min(100, max(0, (hz - self.settings.get("minFrequency", 110)) / (self.settings.get("maxFrequency", 1760) - self.settings.get("minFrequency", 110)) * 100))
+					percent = min(100, max(0, (hz - settings.min_frequency) / settings.frequency_span * 100))
+					percent = quantize_percent(percent, settings.percent_resolution)
 				
-				self.handleProgressAnnouncements(percent, obj)
+				if not self.handleProgressAnnouncements(percent, obj):
+					return
 				
-				if percent != getattr(sound_context, 'last_progress_value', -1):
+				state = self.progressStates.get(id(obj))
+				if state is not None and state[0] is obj:
+					lastSounded = state[2]
+				else:
+					state = None
+					lastSounded = getattr(sound_context, 'last_progress_value', -1)
+				if percent != lastSounded:
 					try:
-						if self.sound_processor:
+						if self.sound_processor and self.sound_processor.is_output_alive():
 							self.sound_processor.play_progress_sound(percent, direction)
 							sound_context.last_progress_value = percent
+							if state is not None:
+								state[2] = percent
+						else:
+							self.originalBeep(hz, length, left=left, right=right)
 					except Exception as e:
 						log.error(f"SoundAlign: Error playing progress sound: {e}. Falling back to original beep.")
 						self.originalBeep(hz, length, left=left, right=right)
 		else:
-			leftVol, rightVol = self.getBalance(direction)
-			master = self.settings.get("masterVolume", 100) / 100.0
+			if self.sound_processor and self.sound_processor.is_output_alive():
+				self.sound_processor.play_tone(hz, length, leftVol, rightVol, soundType)
+				return
+			master = settings.master_volume
 			self.originalBeep(hz, length, left=int(leftVol * 100 * master), right=int(rightVol * 100 * master))
 			
+	def getBeepProgress(self):
+		current = getattr(sound_context, 'current_progress', None)
+		if current is not None:
+			return current
+		obj = api.getFocusObject()
+		state = self.progressStates.get(id(obj))
+		if state is not None and state[0] is obj:
+			return obj, state[1]
+		percent = self.sound_processor.get_progress_percent(obj) if self.sound_processor else None
+		return obj, percent
+
+	def event_valueChange(self, obj, nextHandler):
+		if not self.sound_processor or not self.soundSettings.active or obj.role != PROGRESSBAR_ROLE:
+			nextHandler()
+			return
+		percent = self.sound_processor.get_progress_percent(obj)
+		states = self.progressStates
+		state = states.get(id(obj))
+		if state is None or state[0] is not obj:
+			if len(states) >= PROGRESS_STATE_LIMIT:
+				states.clear()
+			state = states[id(obj)] = [obj, percent, -1]
+		else:
+			state[1] = percent
+		# NVDA beeps for the progress bar from within nextHandler; the hook picks up the
+		# value resolved here instead of querying the focus object again. It is kept per
+		# thread so a beep from another thread never takes this bar's value.
+		sound_context.current_progress = (obj, percent)
+		try:
+			nextHandler()
+		finally:
+			sound_context.current_progress = None
+
 	def safeBeepWinsound(self, frequency, duration):
-		if winsound is None or not self.settings.get("isActive", True):
+		if winsound is None or not self.soundSettings.active:
 			if self.originalWinsoundBeep:
 				self.originalWinsoundBeep(frequency, duration)
 			return
@@ -557,13 +636,14 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		
 	def handleProgressAnnouncements(self, percent, obj):
 		if not isinstance(percent, (int, float)) or percent < 0:
-			return
+			return False
 			
+		settings = self.soundSettings
 		current_time = time.time()
-		time_interval = self.settings.get("timeBasedInterval", 0)
-		speech_interval = self.settings.get("speechPercentageInterval", 10)
-		beep_interval = self.settings.get("beepPercentageInterval", 5)
-		mixed_mode = self.settings.get("mixedMode", False)
+		time_interval = settings.time_interval
+		speech_interval = settings.speech_interval
+		beep_interval = settings.beep_interval
+		mixed_mode = settings.mixed_mode
 		
 		if obj != self.last_progress_object:
 			self.last_progress_object = obj
@@ -571,48 +651,85 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			self.last_beep_percent = -1
 			self.last_time_announced = 0
 		
+		beep_step = self.isBeepStep(percent, max(beep_interval, settings.percent_resolution))
+		
 		if time_interval > 0 and current_time - self.last_time_announced >= time_interval:
 			ui.message(_("{percent}% complete").format(percent=int(percent)))
 			self.last_time_announced = current_time
 			self.last_spoken_percent = percent
-			return
+			return beep_step
 		
-		if mixed_mode:
-			if percent % speech_interval == 0 and percent != self.last_spoken_percent:
-				ui.message(_("{percent}% complete").format(percent=int(percent)))
-				self.last_spoken_percent = percent
-			elif percent % beep_interval == 0 and percent != self.last_beep_percent:
-				self.last_beep_percent = percent
-		else:
-			if percent % speech_interval == 0 and percent != self.last_spoken_percent:
-				ui.message(_("{percent}% complete").format(percent=int(percent)))
-				self.last_spoken_percent = percent
+		if percent % speech_interval == 0 and percent != self.last_spoken_percent:
+			ui.message(_("{percent}% complete").format(percent=int(percent)))
+			self.last_spoken_percent = percent
+			if mixed_mode:
+				return False
+		return beep_step
+
+	def isBeepStep(self, percent, beep_interval):
+		last = self.last_beep_percent
+		if last >= 0 and percent // beep_interval == last // beep_interval:
+			return False
+		self.last_beep_percent = percent
+		return True
 
 	def getSoundType(self, hz, length):
-		if hz == 600 and length == 300:
+		if (hz, length) == ERROR_BEEP:
 			return ERROR_WARNING
 		
-		if (110 <= hz <= 2000 and 15 <= length <= 60) or (hz == 2000 and length == 150):
+		if (
+			(PROGRESS_MIN_HZ <= hz <= PROGRESS_MAX_HZ and PROGRESS_MIN_LENGTH <= length <= PROGRESS_MAX_LENGTH)
+			or (hz, length) == PROGRESS_DONE_BEEP
+		):
 			return PROGRESS_INDICATOR
 			
 		return ADDON_BEEP
 
 	def getDirection(self, soundType, hz=None):
+		settings = self.soundSettings
 		if soundType == ADDON_BEEP:
-			if hz is not None and hz < 1000:
-				direction = self.settings.get("addonBeepDirectionA", LEFT)
+			if hz is not None and hz < ADDON_BEEP_SPLIT_HZ:
+				direction = settings.addon_beep_direction_a
 			else:
-				direction = self.settings.get("addonBeepDirectionB", RIGHT)
+				direction = settings.addon_beep_direction_b
+		elif soundType == ERROR_WARNING:
+			direction = settings.error_direction
+		elif soundType == SOUND_EFFECTS:
+			direction = settings.effects_direction
+		elif soundType == PROGRESS_INDICATOR:
+			direction = settings.progress_direction
 		else:
-			settingMap = {
-				ERROR_WARNING: "errorDirection",
-				SOUND_EFFECTS: "effectsDirection",
-				PROGRESS_INDICATOR: "progressDirection",
-			}
-			direction = self.settings.get(settingMap.get(soundType), LEFT_TO_RIGHT if soundType == PROGRESS_INDICATOR else CENTER)
+			direction = CENTER
 		
 		return direction
 
+	def compileRoutes(self):
+		exact = {}
+		for hz, length in KNOWN_BEEPS:
+			exact[(hz, length)] = self.compileRoute(hz, length)
+		# Each band is compiled from its lowest value; the band below the first edge uses a
+		# value just under it.
+		hzSamples = (math.nextafter(ROUTE_HZ_BOUNDS[0], -math.inf),) + ROUTE_HZ_BOUNDS
+		lengthSamples = (math.nextafter(ROUTE_LENGTH_BOUNDS[0], -math.inf),) + ROUTE_LENGTH_BOUNDS
+		bands = tuple(
+			tuple(self.compileRoute(hz, length) for length in lengthSamples)
+			for hz in hzSamples
+		)
+		return (exact, bands)
+
+	def compileRoute(self, hz, length):
+		soundType = self.getSoundType(hz, length)
+		direction = self.getDirection(soundType, hz)
+		leftVol, rightVol = self.getBalance(direction)
+		return (soundType, direction, leftVol, rightVol)
+
+	def routeBeep(self, hz, length):
+		exact, bands = self.routes
+		route = exact.get((hz, length))
+		if route is None:
+			route = bands[bisect_right(ROUTE_HZ_BOUNDS, hz)][bisect_right(ROUTE_LENGTH_BOUNDS, length)]
+		return route
+
 	def getBalance(self, direction):
 		if direction == LEFT:
 			return (1.0, 0.0)
@@ -626,26 +743,24 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 
 	def applySettings(self):
 		try:
-			self.settings = loadSettings()
+			self.settings = getSettingsStore().get_all()
 			if self.sound_processor:
-				waveform_type = self.settings.get("waveformType", 0)
-				self.sound_processor.harmonics = WAVEFORM_MAP.get(waveform_type, TONE_SINE)
-				self.sound_processor.fade_algorithm = self.settings.get("fadeAlgorithm", "cosine")
-				self.sound_processor.volume = self.settings.get("volume", 0.5)
-				self.sound_processor.master_volume = self.settings.get("masterVolume", 100) / 100.0
-				self.sound_processor.min_frequency = self.settings.get("minFrequency", 110)
-				self.sound_processor.max_frequency = self.settings.get("maxFrequency", 1760)
-				self.sound_processor.smooth_panning = self.settings.get("smoothPanning", True)
+				self.soundSettings = self.sound_processor.apply_settings(self.settings)
 				if not self.sound_processor.player_thread or not self.sound_processor.player_thread.is_alive():
 					log.warning("SoundAlign: Player thread not running, restarting")
 					self.sound_processor.start_player_thread()
 			else:
+				self.soundSettings = SoundSettings(self.settings)
 				log.warning("SoundAlign: No sound processor available for settings application")
+			self.routes = self.compileRoutes()
 		except Exception as e:
 			log.error(f"SoundAlign: Error applying settings: {e}")
 
 	def testBeep(self, freq, duration, direction, soundType):
 		leftVol, rightVol = self.getBalance(direction)
+		if self.sound_processor and self.sound_processor.is_output_alive():
+			self.sound_processor.play_tone(freq, duration, leftVol, rightVol, soundType)
+			return
 		master = self.settings.get("masterVolume", 100) / 100.0
 		self.originalBeep(freq, duration, left=int(leftVol*100*master), right=int(rightVol*100*master))
 
@@ -665,19 +780,14 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 				ui.message(_("Progress test not available. Pyaudio not imported."))
 				return
 			
-			original_harmonics = self.sound_processor.harmonics
-			self.sound_processor.harmonics = WAVEFORM_MAP.get(waveform_type, TONE_SINE)
-			original_master = self.sound_processor.master_volume
-			self.sound_processor.master_volume = self.settings.get("masterVolume", 100) / 100.0
+			test_values = dict(self.settings, waveformType=waveform_type)
+			test_settings = self.sound_processor.build_settings(test_values)
 			
 			self.sound_processor.flush_queue()
 			for i in range(0, 101, 2):
 				percent = i
-				self.sound_processor.play_progress_sound(percent, direction=direction)
+				self.sound_processor.play_progress_sound(percent, direction=direction, settings=test_settings)
 				time.sleep(0.02)
-			
-			self.sound_processor.harmonics = original_harmonics
-			self.sound_processor.master_volume = original_master
 
 	@script(
 		description=_("Open SoundAlign settings (single tap) or toggle SoundAlign on/off (double tap)"),
@@ -740,4 +850,5 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		if self.sound_processor:
 			self.sound_processor.stop()
 		
+		getSettingsStore().close()
 		GlobalPlugin.instance = None
\ No newline at end of file
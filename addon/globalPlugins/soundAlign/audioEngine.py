@@ -0,0 +1,367 @@
+# audioEngine.py
+# Copyright (C) 2026 Chai Chaimee
+# Licensed under GNU General Public License. See COPYING.txt for details.
+
+import array
+import operator
+import time
+from collections import deque
+from itertools import repeat
+from logHandler import log
+
+LATENCY_REPORT_INTERVAL = 100
+
+# Mixed blocks are scaled so their peak stays under the ceiling; the gain drops at once
+# and recovers a fraction of the way back to unity on every following block.
+LIMITER_CEILING = 32000
+LIMITER_RELEASE = 0.2
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_COALESCE = "coalesce"
+POLICY_BLOCK = "block"
+
+BLOCK_POLL_INTERVAL = 0.002
+
+# Gain applied to sources while a higher priority sound is playing; 0.0 preempts them.
+DUCK_GAIN = 0.25
+
+
+class LatencyMeter:
+
+	def __init__(self, name, report_interval=LATENCY_REPORT_INTERVAL):
+		self.name = name
+		self.report_interval = report_interval
+		self.reset()
+
+	def reset(self):
+		self.count = 0
+		self.total = 0.0
+		self.maximum = 0.0
+		self.last = 0.0
+
+	def add(self, seconds):
+		self.count += 1
+		self.total += seconds
+		self.last = seconds
+		if seconds > self.maximum:
+			self.maximum = seconds
+		if self.count % self.report_interval == 0:
+			log.debug(f"SoundProcessor: {self}")
+
+	@property
+	def mean(self):
+		return self.total / self.count if self.count else 0.0
+
+	def __repr__(self):
+		return (
+			f"{self.name} latency: n={self.count}, mean={self.mean * 1000:.1f} ms, "
+			f"max={self.maximum * 1000:.1f} ms, last={self.last * 1000:.1f} ms"
+		)
+
+
+class PcmRingBuffer:
+
+	def __init__(
+		self,
+		capacity_frames,
+		channels,
+		sample_width,
+		policy=POLICY_DROP_NEWEST,
+		max_lag_frames=None,
+		block_timeout=0.0,
+		name="stream"
+	):
+		self.frame_bytes = channels * sample_width
+		self.capacity = capacity_frames * self.frame_bytes
+		self._buffer = memoryview(bytearray(self.capacity))
+		# Monotonic byte counters: only the producer advances _write and only the consumer
+		# advances _read, so neither side ever needs a lock. _flush_to is published by the
+		# producer and applied by the consumer on its next read. Timestamped writes leave a
+		# marker at their start, which is where the consumer applies the coalesce and
+		# drop-oldest policies.
+		self._write = 0
+		self._read = 0
+		self._flush_to = 0
+		self._markers = deque()
+		self.name = name
+		self.policy = policy
+		self.max_lag = self.capacity if max_lag_frames is None else max_lag_frames * self.frame_bytes
+		self.block_timeout = block_timeout
+		self.high_water = 0
+		self.drops = 0
+		self.overruns = 0
+		self.enqueue_wait = LatencyMeter(f"{name} enqueue")
+
+	def _read_position(self):
+		return max(self._read, self._flush_to)
+
+	@property
+	def available(self):
+		return self._write - self._read_position()
+
+	@property
+	def free(self):
+		return self.capacity - self.available
+
+	def _admit(self, size):
+		queued = self._write - self._read_position()
+		if size > self.capacity - queued:
+			return False
+		if self.policy in (POLICY_DROP_NEWEST, POLICY_BLOCK):
+			return queued <= self.max_lag
+		return True
+
+	def write(self, data, timestamp=None):
+		start_time = time.perf_counter()
+		data = memoryview(data).cast('B')
+		size = len(data) - len(data) % self.frame_bytes
+		admitted = self._admit(size)
+		if not admitted and self.policy in (POLICY_COALESCE, POLICY_DROP_OLDEST) and size <= self.capacity:
+			self._make_room(size)
+			admitted = self._admit(size)
+		if not admitted and self.policy == POLICY_BLOCK:
+			deadline = start_time + self.block_timeout
+			while not admitted and time.perf_counter() < deadline:
+				time.sleep(BLOCK_POLL_INTERVAL)
+				admitted = self._admit(size)
+		if not admitted:
+			if size > self.capacity - self.available:
+				self.overruns += 1
+			else:
+				self.drops += 1
+			self.enqueue_wait.add(time.perf_counter() - start_time)
+			return False
+		write = self._write
+		start = write % self.capacity
+		first = min(size, self.capacity - start)
+		self._buffer[start:start + first] = data[:first]
+		if first < size:
+			self._buffer[:size - first] = data[first:size]
+		if timestamp is not None:
+			self._markers.append((write, timestamp))
+		self._write = write + size
+		queued = self._write - self._read_position()
+		if queued > self.high_water:
+			self.high_water = queued
+		self.enqueue_wait.add(time.perf_counter() - start_time)
+		return True
+
+	def _make_room(self, size):
+		# Coalesce and drop-oldest never reject the newest tone: queued audio is discarded
+		# from the oldest end, up to the first tone boundary that leaves room for it.
+		needed = self._write + size - self.capacity
+		boundary = self._write
+		discarded = 0
+		for position, timestamp in tuple(self._markers):
+			if position >= needed:
+				boundary = position
+				break
+			if position >= self._read_position():
+				discarded += 1
+		if boundary > self._flush_to:
+			self._flush_to = boundary
+			self.drops += discarded
+
+	def _skip_queued(self, read, write):
+		markers = self._markers
+		if self.policy == POLICY_COALESCE:
+			while len(markers) > 1 and markers[1][0] < write:
+				markers.popleft()
+				self.drops += 1
+		elif self.policy == POLICY_DROP_OLDEST:
+			while len(markers) > 1 and markers[1][0] < write and markers[-1][0] - read > self.max_lag:
+				markers.popleft()
+				self.drops += 1
+		return markers[0][0]
+
+	def read_into(self, out):
+		write = self._write
+		read = self._read
+		markers = self._markers
+		flush_to = self._flush_to
+		if flush_to > read:
+			read = flush_to
+			while markers and markers[0][0] < read:
+				markers.popleft()
+		started = []
+		filled = 0
+		limit = len(out) - len(out) % self.frame_bytes
+		while filled < limit and read < write:
+			if markers and markers[0][0] <= read:
+				read = self._skip_queued(read, write)
+				started.append((filled // self.frame_bytes, markers.popleft()[1]))
+			end = min(write, read + limit - filled)
+			if markers and markers[0][0] < end:
+				end = markers[0][0]
+			start = read % self.capacity
+			size = min(end - read, self.capacity - start)
+			out[filled:filled + size] = self._buffer[start:start + size]
+			filled += size
+			read += size
+		self._read = read
+		return filled, started
+
+	def stats(self):
+		return {
+			"policy": self.policy,
+			"queued_bytes": self.available,
+			"high_water_bytes": self.high_water,
+			"drops": self.drops,
+			"overruns": self.overruns,
+			"enqueue_wait_ms": self.enqueue_wait.mean * 1000,
+		}
+
+	def clear(self):
+		self._flush_to = self._write
+
+
+class Voice:
+
+	__slots__ = ("samples", "position", "gain", "sound_type", "enqueue_time", "overlap", "delay")
+
+	def __init__(self, pcm, gain=1.0, sound_type=None, enqueue_time=None, overlap=0):
+		self.samples = memoryview(pcm).cast('B').cast('h')
+		self.position = 0
+		self.gain = gain
+		self.sound_type = sound_type
+		self.enqueue_time = enqueue_time
+		self.overlap = overlap
+		self.delay = 0
+
+	@property
+	def finished(self):
+		return self.position >= len(self.samples)
+
+
+class Mixer:
+
+	def __init__(self, streams, channels=2, priorities=None, duck_gain=DUCK_GAIN):
+		self.streams = list(streams)
+		self.channels = channels
+		self.priorities = priorities or {}
+		self.duck_gain = duck_gain
+		self.limiter_gain = 1.0
+		self._voices = []
+		self._incoming = deque()
+		self._overlap_chains = {}
+		self._duck_gains = {}
+		self._clear_requested = False
+		self._stream_buffers = [memoryview(bytearray(0)) for stream in self.streams]
+
+	@property
+	def active_voices(self):
+		return len(self._voices) + len(self._incoming)
+
+	def add_voice(self, voice):
+		self._incoming.append(voice)
+
+	def clear(self):
+		# Voices posted before the clear but not yet picked up by render are dropped with
+		# the old deque; only voices added afterwards reach the next block.
+		self._incoming = deque()
+		self._clear_requested = True
+
+	def render(self, out):
+		if self._clear_requested:
+			self._clear_requested = False
+			self._voices = []
+			self._overlap_chains = {}
+		incoming = self._incoming
+		while incoming:
+			voice = incoming.popleft()
+			if voice.overlap:
+				self._schedule_overlap(voice)
+			self._voices.append(voice)
+
+		size = len(out)
+		count = size // 2
+		priorities = self.priorities
+		started = []
+		sources = []
+		for index, stream in enumerate(self.streams):
+			buffer = self._stream_buffers[index]
+			if len(buffer) != size:
+				buffer = self._stream_buffers[index] = memoryview(bytearray(size))
+			stream_size, stream_started = stream.read_into(buffer)
+			if stream_size:
+				sources.append((buffer[:stream_size].cast('h'), 1.0, 0, priorities.get(stream.name, 0)))
+				started.extend((offset, timestamp, stream.name) for offset, timestamp in stream_started)
+		for voice in self._voices:
+			offset = voice.delay
+			if offset >= count:
+				voice.delay -= count
+				continue
+			voice.delay = 0
+			if voice.position == 0 and voice.enqueue_time is not None:
+				started.append((offset // self.channels, voice.enqueue_time, voice.sound_type))
+			chunk = voice.samples[voice.position:voice.position + count - offset]
+			voice.position += len(chunk)
+			sources.append((chunk, voice.gain, offset, priorities.get(voice.sound_type, 0)))
+		if self._voices:
+			self._voices = [voice for voice in self._voices if not voice.finished]
+		if not sources:
+			self._duck_gains = {}
+			return 0, started
+
+		# Sources below the highest active priority are ducked. Gain changes are ramped
+		# across one block so the switch lands within a device buffer without a click.
+		top = max(source[3] for source in sources)
+		duck_gains = self._duck_gains
+		ramps = {}
+		for priority in set(source[3] for source in sources):
+			target = 1.0 if priority >= top else self.duck_gain
+			current = duck_gains.get(priority, target)
+			ramps[priority] = (current, target)
+		self._duck_gains = {priority: ramp[1] for priority, ramp in ramps.items()}
+
+		if len(sources) == 1 and self.limiter_gain == 1.0:
+			chunk, gain, offset, priority = sources[0]
+			if gain == 1.0 and offset == 0 and ramps[priority] == (1.0, 1.0):
+				chunk = chunk.cast('B')
+				out[:len(chunk)] = chunk
+				if len(chunk) < size:
+					out[len(chunk):] = bytes(size - len(chunk))
+				return size, started
+
+		mix = [0] * count
+		for chunk, gain, offset, priority in sources:
+			length = len(chunk)
+			current, target = ramps[priority]
+			if current != target:
+				step = (target - current) / count
+				chunk = map(
+					operator.mul,
+					chunk,
+					[gain * (current + step * (offset + i)) for i in range(length)]
+				)
+			elif gain * target != 1.0:
+				chunk = map(operator.mul, chunk, repeat(gain * target, length))
+			end = offset + length
+			mix[offset:end] = map(operator.add, mix[offset:end], chunk)
+		out[:] = memoryview(self._limit(mix)).cast('B')
+		return size, started
+
+	def _schedule_overlap(self, voice):
+		# Start the voice as the previous one in its chain begins fading out. A previous
+		# voice that has not started yet is replaced, so only the newest tone waits.
+		previous = self._overlap_chains.get(voice.sound_type)
+		self._overlap_chains[voice.sound_type] = voice
+		if previous is None or previous.finished:
+			return
+		if previous.position == 0:
+			voice.delay = previous.delay
+			self._voices.remove(previous)
+		else:
+			voice.delay = max(0, len(previous.samples) - previous.position - voice.overlap)
+
+	def _limit(self, mix):
+		peak = max(max(mix), -min(mix))
+		target = LIMITER_CEILING / peak if peak > LIMITER_CEILING else 1.0
+		if target < self.limiter_gain:
+			self.limiter_gain = target
+		else:
+			self.limiter_gain = min(target, self.limiter_gain + (1.0 - self.limiter_gain) * LIMITER_RELEASE)
+		if self.limiter_gain < 1.0:
+			mix = map(operator.mul, mix, repeat(self.limiter_gain, len(mix)))
+		return array.array('h', map(int, mix))
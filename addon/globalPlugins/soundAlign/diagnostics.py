@@ -0,0 +1,272 @@
+# diagnostics.py
+# Backend parity checks and synthesis benchmarks for SoundAlign.
+# Run from the NVDA Python console, for example:
+#   from globalPlugins.soundAlign import diagnostics; diagnostics.check_backend_parity()
+# Copyright (C) 2026 Chai Chaimee
+# Licensed under GNU General Public License. See COPYING.txt for details.
+
+import array
+import math
+import time
+from logHandler import log
+from .audioEngine import LatencyMeter
+from .soundUtils import (
+	SAMPLE_RATE,
+	CHANNELS,
+	LEFT,
+	RIGHT,
+	CENTER,
+	LEFT_TO_RIGHT,
+	ERROR_WARNING,
+	SOUND_EFFECTS,
+	PROGRESS_INDICATOR,
+	ADDON_BEEP,
+	WAVEFORM_MAP,
+	FADE_ALGORITHMS
+)
+from .synthesis import (
+	FadeEnvelopeCache,
+	FastPythonBackend,
+	NumpyBackend,
+	PythonBackend,
+	numpy
+)
+
+TEST_FREQUENCIES = (110, 440, 1760)
+TEST_DURATION = 0.1
+TEST_GAINS = (0.35, 0.15)
+FADE_RATIO = 0.5
+
+
+def _render(backend, fade_cache, table, fade_algorithm, frequency, duration=TEST_DURATION):
+	num_samples = int(SAMPLE_RATE * duration)
+	envelope = fade_cache.get(fade_algorithm, int(num_samples * CHANNELS * FADE_RATIO / 2))
+	return backend.render_tone(table, frequency, num_samples, SAMPLE_RATE, *TEST_GAINS, envelope)
+
+
+def check_backend_parity(tolerance=1):
+	if numpy is None:
+		log.info("SoundAlign diagnostics: NumPy is not available, nothing to compare")
+		return None
+	reference = PythonBackend()
+	vectorized = NumpyBackend()
+	fade_cache = FadeEnvelopeCache()
+	failures = []
+	for waveform, harmonics in WAVEFORM_MAP.items():
+		reference_table = reference.build_wavetable(tuple(harmonics))
+		vectorized_table = vectorized.build_wavetable(tuple(harmonics))
+		for fade_algorithm in FADE_ALGORITHMS:
+			for frequency in TEST_FREQUENCIES:
+				expected = _render(reference, fade_cache, reference_table, fade_algorithm, frequency)
+				actual = _render(vectorized, fade_cache, vectorized_table, fade_algorithm, frequency)
+				expected = array.array('h', expected)
+				actual = array.array('h', actual)
+				if len(expected) != len(actual):
+					failures.append((waveform, fade_algorithm, frequency, "length"))
+					continue
+				difference = max(abs(a - b) for a, b in zip(expected, actual))
+				if difference > tolerance:
+					failures.append((waveform, fade_algorithm, frequency, difference))
+	if failures:
+		log.error(f"SoundAlign diagnostics: Backend parity failed for {failures}")
+	else:
+		log.info(f"SoundAlign diagnostics: Backends agree within {tolerance} LSB")
+	return not failures
+
+
+def _baseline_generate_tone(harmonics, frequency, duration):
+	# Verbatim copy of SoundProcessor._generate_tone before wavetable synthesis.
+	samples = array.array('h')
+	num_samples = int(SAMPLE_RATE * duration)
+
+	for i in range(num_samples):
+		t = i / SAMPLE_RATE
+		value = 0.0
+		for j, amplitude in enumerate(harmonics):
+			value += amplitude * math.sin(2 * math.pi * frequency * (j + 1) * t)
+		value = max(min(value, 1.0), -1.0) * 32767
+		samples.append(int(value))
+
+	return samples
+
+
+def _baseline_apply_fade(samples, fade_ratio, fade_algorithm):
+	# Verbatim copy of SoundProcessor._apply_fade before cached envelopes.
+	fade_samples = array.array('h', samples)
+	fade_length = int(len(samples) * fade_ratio / 2)
+
+	for i in range(fade_length):
+		t = i / fade_length if fade_length > 0 else 0
+
+		if fade_algorithm == "cosine":
+			fade = 0.5 * (1 - math.cos(math.pi * i / fade_length))
+		elif fade_algorithm == "gaussian":
+			fade = math.exp(-((i - fade_length) ** 2) / (2 * (fade_length / 3) ** 2))
+		elif fade_algorithm == "linear":
+			fade = t
+		elif fade_algorithm == "exponential":
+			fade = 1 - math.exp(-5 * t)
+		elif fade_algorithm == "logarithmic":
+			fade = math.log(1 + 9 * t) / math.log(10)
+		elif fade_algorithm == "s_curve":
+			fade = 1 / (1 + math.exp(-12 * (t - 0.5)))
+		elif fade_algorithm == "sine":
+			fade = math.sin(math.pi * t / 2)
+		elif fade_algorithm == "quarter_sine":
+			fade = math.sin(math.pi * t / 2)
+		elif fade_algorithm == "half_sine":
+			fade = (1 - math.cos(math.pi * t)) / 2
+		elif fade_algorithm == "square_root":
+			fade = math.sqrt(t)
+		elif fade_algorithm == "cubic_root":
+			fade = t ** (1/3)
+		elif fade_algorithm == "quadratic":
+			fade = t ** 2
+		else:
+			fade = t
+
+		fade_samples[i] = int(fade_samples[i] * fade)
+		fade_samples[-(i + 1)] = int(fade_samples[-(i + 1)] * fade)
+
+	return fade_samples
+
+
+def _sweep_frequencies(repeat):
+	return [110 + i * 1650 / max(repeat - 1, 1) for i in range(repeat)]
+
+
+def _time_baseline(harmonics, repeat):
+	frequencies = _sweep_frequencies(repeat)
+	start = time.perf_counter()
+	for frequency in frequencies:
+		_baseline_apply_fade(_baseline_generate_tone(harmonics, frequency, TEST_DURATION), FADE_RATIO, "cosine")
+	return (time.perf_counter() - start) / repeat
+
+
+def _time_backend(backend_class, harmonics, repeat):
+	backend = backend_class()
+	fade_cache = FadeEnvelopeCache()
+	table = backend.build_wavetable(tuple(harmonics))
+	# Warm up on a pitch outside the sweep: a progress sweep renders each frequency once,
+	# so every timed tone is the backend's first render at that pitch.
+	_render(backend, fade_cache, table, "cosine", 100)
+	frequencies = _sweep_frequencies(repeat)
+	start = time.perf_counter()
+	for frequency in frequencies:
+		_render(backend, fade_cache, table, "cosine", frequency)
+	return (time.perf_counter() - start) / repeat
+
+
+def benchmark_backends(repeat=20):
+	backends = [PythonBackend, FastPythonBackend]
+	if numpy is not None:
+		backends.append(NumpyBackend)
+	results = {}
+	for waveform, harmonics in WAVEFORM_MAP.items():
+		reference = _time_baseline(harmonics, repeat)
+		timings = {backend.name: _time_backend(backend, harmonics, repeat) for backend in backends}
+		timings["baseline"] = reference
+		results[waveform] = timings
+		line = ", ".join(
+			f"{name} {seconds * 1000:.2f} ms ({reference / seconds:.1f}x)"
+			for name, seconds in timings.items()
+		)
+		log.info(f"SoundAlign diagnostics: waveform {waveform} first render: {line}")
+	return results
+
+
+BENCHMARK_ROUNDS = 3
+ROUTING_BEEPS = [(hz, length) for hz in (220, 440, 880, 1500, 3000) for length in (80, 100, 200)]
+
+
+def _time_calls(route, repeat):
+	beeps = ROUTING_BEEPS * (repeat // len(ROUTING_BEEPS) + 1)
+	start = time.perf_counter()
+	for hz, length in beeps:
+		route(hz, length)
+	return len(beeps) / (time.perf_counter() - start)
+
+
+class _SilentProcessor:
+
+	is_running = True
+
+	def __init__(self):
+		self.caller_time = LatencyMeter("caller")
+
+	def is_output_alive(self):
+		return True
+
+	def play_tone(self, frequency, duration_ms, left_gain, right_gain, sound_type=None):
+		pass
+
+
+def _legacy_beep(plugin):
+	# The add-on beep path of safeBeep before routes were compiled: settings dict lookups
+	# and chained type, direction and balance calls on every beep.
+	def getDirection(soundType, hz=None):
+		settings = plugin.settings
+		if soundType == ADDON_BEEP:
+			if hz is not None and hz < 1000:
+				direction = settings.get("addonBeepDirectionA", LEFT)
+			else:
+				direction = settings.get("addonBeepDirectionB", RIGHT)
+		else:
+			settingMap = {
+				ERROR_WARNING: "errorDirection",
+				SOUND_EFFECTS: "effectsDirection",
+				PROGRESS_INDICATOR: "progressDirection",
+			}
+			direction = settings.get(
+				settingMap.get(soundType),
+				LEFT_TO_RIGHT if soundType == PROGRESS_INDICATOR else CENTER
+			)
+		return direction
+
+	def handleBeep(hz, length, left=50, right=50, *args, **kwargs):
+		if not plugin.settings.get("isActive", True):
+			return plugin.originalBeep(hz, length, left, right, *args, **kwargs)
+		soundType = plugin.getSoundType(hz, length)
+		direction = getDirection(soundType, hz)
+		if soundType == PROGRESS_INDICATOR:
+			return
+		leftVol, rightVol = plugin.getBalance(direction)
+		if plugin.sound_processor and plugin.sound_processor.is_running:
+			plugin.sound_processor.play_tone(hz, length, leftVol, rightVol, soundType)
+
+	def safeBeep(hz, length, left=50, right=50, *args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return handleBeep(hz, length, left, right, *args, **kwargs)
+		finally:
+			if plugin.sound_processor:
+				plugin.sound_processor.caller_time.add(time.perf_counter() - start)
+	return safeBeep
+
+
+def benchmark_routing(plugin=None, repeat=50000):
+	if plugin is None:
+		from . import GlobalPlugin
+		plugin = GlobalPlugin.instance
+
+	# Both paths run the full beep hook, but tones go to a silent processor so the run
+	# measures hook overhead and is not heard.
+	processor = plugin.sound_processor
+	originalBeep = plugin.originalBeep
+	plugin.sound_processor = _SilentProcessor()
+	plugin.originalBeep = lambda *args, **kwargs: None
+	legacy_beep = _legacy_beep(plugin)
+	legacy = compiled = 0.0
+	try:
+		# Alternate the two paths and keep the best round of each to even out warm-up.
+		for _ in range(BENCHMARK_ROUNDS):
+			legacy = max(legacy, _time_calls(legacy_beep, repeat))
+			compiled = max(compiled, _time_calls(plugin.safeBeep, repeat))
+	finally:
+		plugin.sound_processor = processor
+		plugin.originalBeep = originalBeep
+	log.info(
+		f"SoundAlign diagnostics: add-on beep safeBeep {legacy:,.0f}/s chained routing, "
+		f"{compiled:,.0f}/s compiled routing ({compiled / legacy:.1f}x)"
+	)
+	return {"chained": legacy, "compiled": compiled}
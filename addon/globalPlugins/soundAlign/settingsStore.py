@@ -0,0 +1,138 @@
+# settingsStore.py
+# Copyright (C) 2026 Chai Chaimee
+# Licensed under GNU General Public License. See COPYING.txt for details.
+
+import json
+import os
+import shutil
+import threading
+from logHandler import log
+
+SAVE_DELAY = 0.5
+
+
+class SettingsStore:
+
+	def __init__(self, path, defaults, legacy_path=None, save_delay=SAVE_DELAY, on_error=None):
+		self.path = path
+		self.defaults = dict(defaults)
+		self.legacy_path = legacy_path
+		self.save_delay = save_delay
+		self.on_error = on_error
+		self._values = dict(defaults)
+		self._mtime = None
+		self._version = 0
+		self._saved_version = 0
+		self._timer = None
+		self._lock = threading.Lock()
+		self._write_lock = threading.Lock()
+
+	@property
+	def dirty(self):
+		return self._version != self._saved_version
+
+	def get_all(self):
+		with self._lock:
+			return dict(self._values)
+
+	def load(self):
+		path = self.path
+		if not os.path.exists(path) and self.legacy_path and os.path.exists(self.legacy_path):
+			if not self._migrate():
+				path = self.legacy_path
+		try:
+			mtime = os.stat(path).st_mtime_ns
+		except OSError:
+			mtime = None
+		if mtime is None:
+			if self._mtime is None:
+				self._mark_dirty()
+		elif mtime != self._mtime and not self.dirty:
+			self._read(path, mtime)
+		return self.get_all()
+
+	def update(self, values):
+		with self._lock:
+			changed = False
+			for key, value in values.items():
+				if key in self.defaults and self._values.get(key) != value:
+					self._values[key] = value
+					changed = True
+			if not changed:
+				return False
+			self._version += 1
+		self._schedule()
+		return True
+
+	def flush(self):
+		with self._write_lock:
+			with self._lock:
+				if not self.dirty:
+					return True
+				values = dict(self._values)
+				version = self._version
+			temp_path = self.path + ".tmp"
+			try:
+				os.makedirs(os.path.dirname(self.path), exist_ok=True)
+				with open(temp_path, "w", encoding="utf-8") as f:
+					json.dump(values, f, ensure_ascii=False, indent=4)
+				os.replace(temp_path, self.path)
+				mtime = os.stat(self.path).st_mtime_ns
+			except Exception as e:
+				log.error(f"SoundAlign: Error saving settings: {e}")
+				if self.on_error:
+					self.on_error(e)
+				return False
+			with self._lock:
+				self._mtime = mtime
+				self._saved_version = version
+			return True
+
+	def close(self):
+		timer = self._timer
+		if timer:
+			timer.cancel()
+		self.flush()
+
+	def _schedule(self):
+		if self._timer:
+			self._timer.cancel()
+		self._timer = threading.Timer(self.save_delay, self.flush)
+		self._timer.daemon = True
+		self._timer.start()
+
+	def _mark_dirty(self):
+		with self._lock:
+			self._version += 1
+		self._schedule()
+
+	def _read(self, path, mtime):
+		values = dict(self.defaults)
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				user_settings = json.load(f)
+			for key in values:
+				if key in user_settings:
+					values[key] = user_settings[key]
+		except json.JSONDecodeError as e:
+			log.error(f"SoundAlign: Error loading settings: JSON file is corrupted or empty ({e}). Using default settings.")
+			with self._lock:
+				self._values = values
+			self._mark_dirty()
+			return
+		except Exception as e:
+			log.error(f"SoundAlign: Error loading settings: {e}")
+			return
+		with self._lock:
+			self._values = values
+			self._mtime = mtime
+
+	def _migrate(self):
+		try:
+			os.makedirs(os.path.dirname(self.path), exist_ok=True)
+			shutil.move(self.legacy_path, self.path)
+			log.info(f"SoundAlign: Migrated settings from {self.legacy_path} to {self.path}")
+			return True
+		except Exception as e:
+			log.error(f"SoundAlign: Failed to migrate settings to new location: {e}")
+			return False
@@ -1,15 +1,36 @@
 # soundUtils.py
 
 import threading
-import queue
-import math
 import time
 import os
 import sys
-import array
 import re
+from collections import deque
 from logHandler import log
 
+try:
+	import UIAHandler
+except ImportError:
+	UIAHandler = None
+
+from .audioEngine import (
+	LatencyMeter,
+	Mixer,
+	PcmRingBuffer,
+	Voice,
+	POLICY_BLOCK,
+	POLICY_COALESCE,
+	POLICY_DROP_OLDEST
+)
+from .synthesis import (
+	FadeEnvelopeCache,
+	GlideOscillator,
+	ToneAtlas,
+	ToneCache,
+	build_wavetable,
+	get_backend
+)
+
 LEFT = 0
 CENTER = 1
 RIGHT = 2
@@ -26,35 +47,325 @@ TONE_TRIANGLE = [1.0, 0.0, 1/9, 0.0, 1/25, 0.0, 1/49]
 TONE_SAWTOOTH = [1.0, 1/2, 1/3, 1/4, 1/5, 1/6, 1/7]
 TONE_SQUARE = [1.0, 0, 1/3, 0, 1/5, 0, 1/7, 0, 1/9, 0, 1/11]
 
+HARMONIC_SETS = (TONE_SINE, TONE_TRIANGLE, TONE_SAWTOOTH, TONE_SQUARE)
+
+WAVEFORM_MAP = {
+	0: TONE_SINE,
+	1: TONE_TRIANGLE,
+	2: TONE_SAWTOOTH,
+	3: TONE_SQUARE
+}
+
+FADE_ALGORITHMS = [
+	"cosine",
+	"gaussian",
+	"linear",
+	"exponential",
+	"logarithmic",
+	"s_curve",
+	"sine",
+	"quarter_sine",
+	"half_sine",
+	"square_root",
+	"cubic_root",
+	"quadratic"
+]
+
 SAMPLE_RATE = 44100
 CHANNELS = 2
 SAMPLE_WIDTH = 2
 FORMAT = 8
 CHUNK_SIZE = 1024
+FRAME_BYTES = CHANNELS * SAMPLE_WIDTH
+RING_BUFFER_SECONDS = 1
+DEVICE_QUEUE_CHUNKS = 2
+RENDER_QUEUE_LIMIT = 64
+TONE_EDGE_SECONDS = 0.005
+
+# Progress tones shrink toward the smoothed interval between updates when updates arrive
+# faster than a full tone, in steps so the tone cache stays small.
+PROGRESS_RATE_SMOOTHING = 0.3
+PROGRESS_IDLE_SECONDS = 1.0
+MIN_PROGRESS_TONE_SECONDS = 0.03
+PROGRESS_TONE_STEP_SECONDS = 0.01
 
 PAN_BOOST_FACTOR = 1.0
 
+OUTPUT_CALLBACK = "callback"
+OUTPUT_BLOCKING = "blocking"
+OUTPUT_MODES = [OUTPUT_CALLBACK, OUTPUT_BLOCKING]
+
+# Per sound type queueing: (policy, max audio queued ahead of a new sound in seconds,
+# producer wait for the block policy in seconds).
+CHANNEL_POLICIES = {
+	PROGRESS_INDICATOR: (POLICY_COALESCE, 0.2, 0.0),
+	ERROR_WARNING: (POLICY_BLOCK, 0.2, 0.05),
+	SOUND_EFFECTS: (POLICY_DROP_OLDEST, 0.2, 0.0),
+	ADDON_BEEP: (POLICY_DROP_OLDEST, 0.2, 0.0),
+}
+
+PERCENT_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+PERCENT_RESOLUTIONS = [1.0, 0.5, 0.25]
+
+
+def quantize_percent(percent, resolution=1.0):
+	steps = round(max(0.0, min(100.0, percent)) / resolution)
+	return round(steps * resolution, 6)
+
+
+def percent_grid(resolution=1.0):
+	return [round(step * resolution, 6) for step in range(int(round(100.0 / resolution)) + 1)]
+
+UIA_RANGE_VALUE_VALUE_PROPERTY_ID = 30047
+UIA_RANGE_VALUE_MINIMUM_PROPERTY_ID = 30049
+UIA_RANGE_VALUE_MAXIMUM_PROPERTY_ID = 30050
+UIA_RANGE_VALUE_PROPERTY_IDS = (
+	UIA_RANGE_VALUE_VALUE_PROPERTY_ID,
+	UIA_RANGE_VALUE_MINIMUM_PROPERTY_ID,
+	UIA_RANGE_VALUE_MAXIMUM_PROPERTY_ID
+)
+PERCENT_CACHE_LIMIT = 256
+RANGE_CACHE_LIMIT = 32
+
+
+class ProgressValueResolver:
+
+	def __init__(self, cache_limit=PERCENT_CACHE_LIMIT, range_limit=RANGE_CACHE_LIMIT):
+		self.cache_limit = cache_limit
+		self.range_limit = range_limit
+		self.remote_calls = 0
+		self._parsed = {}
+		self._last = (None, None, None)
+		self._no_range = set()
+		self._range_request = None
+
+	def resolve(self, obj, resolution=1.0):
+		if obj is None:
+			return None
+		percent = self._range_percent(obj)
+		if percent is None:
+			percent = self._value_percent(obj)
+		if percent is None:
+			return None
+		return quantize_percent(percent, resolution)
+
+	def clear(self):
+		self._parsed = {}
+		self._last = (None, None, None)
+		self._no_range = set()
+
+	def _range_percent(self, obj):
+		# UIA progress bars expose RangeValue. Value, minimum and maximum come back together
+		# from one cache request, so a beep costs a single cross-process call and a bar that
+		# changes its range is read correctly. Elements without RangeValue are remembered by
+		# runtime id, which survives the fresh NVDAObject NVDA builds for each event.
+		element = getattr(obj, "UIAElement", None)
+		if element is None:
+			return None
+		key = self._element_key(element)
+		if key is not None and key in self._no_range:
+			return None
+		request = self._get_range_request()
+		if request is None:
+			return None
+		try:
+			self.remote_calls += 1
+			cached = element.BuildUpdatedCache(request)
+			value, minimum, maximum = (
+				cached.GetCachedPropertyValue(property_id) for property_id in UIA_RANGE_VALUE_PROPERTY_IDS
+			)
+		except Exception:
+			return None
+		if not all(isinstance(number, (int, float)) for number in (value, minimum, maximum)) or maximum <= minimum:
+			if key is not None:
+				if len(self._no_range) >= self.range_limit:
+					self._no_range.clear()
+				self._no_range.add(key)
+			return None
+		return (value - minimum) / (maximum - minimum) * 100.0
+
+	def _get_range_request(self):
+		request = self._range_request
+		if request is None:
+			handler = getattr(UIAHandler, "handler", None)
+			if handler is None:
+				return None
+			try:
+				request = handler.clientObject.CreateCacheRequest()
+				for property_id in UIA_RANGE_VALUE_PROPERTY_IDS:
+					request.AddProperty(property_id)
+			except Exception as e:
+				log.error(f"SoundProcessor: Error creating RangeValue cache request: {e}")
+				return None
+			self._range_request = request
+		return request
+
+	def _element_key(self, element):
+		try:
+			return tuple(element.GetRuntimeId())
+		except Exception:
+			return None
+
+	def _value_percent(self, obj):
+		try:
+			self.remote_calls += 1
+			value = obj.value
+		except Exception:
+			return None
+		if not value:
+			return None
+		last_obj, last_value, last_percent = self._last
+		if last_obj is obj and last_value == value:
+			return last_percent
+		parsed = self._parsed
+		if value in parsed:
+			percent = parsed[value]
+		else:
+			match = PERCENT_PATTERN.search(value)
+			percent = float(match.group(1).replace(',', '.')) if match else None
+			if len(parsed) >= self.cache_limit:
+				parsed.clear()
+			parsed[value] = percent
+		self._last = (obj, value, percent)
+		return percent
+
+class SoundSettings:
+
+	__slots__ = (
+		"active",
+		"waveform_type",
+		"harmonics",
+		"fade_algorithm",
+		"volume",
+		"master_volume",
+		"min_frequency",
+		"max_frequency",
+		"frequency_span",
+		"tone_gain",
+		"progress_gain",
+		"smooth_panning",
+		"overlap_progress",
+		"percent_resolution",
+		"output_mode",
+		"error_direction",
+		"effects_direction",
+		"progress_direction",
+		"addon_beep_direction_a",
+		"addon_beep_direction_b",
+		"speech_interval",
+		"beep_interval",
+		"time_interval",
+		"mixed_mode",
+		"wavetable",
+		"glide_table",
+		"fade_table",
+	)
+
+	def __init__(self, values, wavetable=None, glide_table=None, fade_table=None):
+		get = values.get
+		fields = {
+			"active": get("isActive", True),
+			"waveform_type": get("waveformType", 0),
+			"harmonics": tuple(WAVEFORM_MAP.get(get("waveformType", 0), TONE_SINE)),
+			"fade_algorithm": get("fadeAlgorithm", "cosine"),
+			"volume": get("volume", 0.5),
+			"master_volume": get("masterVolume", 100) / 100.0,
+			"min_frequency": get("minFrequency", 110),
+			"max_frequency": get("maxFrequency", 1760),
+			"smooth_panning": get("smoothPanning", True),
+			"overlap_progress": get("overlapProgressTones", False),
+			"percent_resolution": get("progressResolution", 1.0),
+			"output_mode": get("outputMode", OUTPUT_CALLBACK),
+			"error_direction": get("errorDirection", CENTER),
+			"effects_direction": get("effectsDirection", CENTER),
+			"progress_direction": get("progressDirection", LEFT_TO_RIGHT),
+			"addon_beep_direction_a": get("addonBeepDirectionA", LEFT),
+			"addon_beep_direction_b": get("addonBeepDirectionB", RIGHT),
+			"speech_interval": get("speechPercentageInterval", 10),
+			"beep_interval": get("beepPercentageInterval", 5),
+			"time_interval": get("timeBasedInterval", 0),
+			"mixed_mode": get("mixedMode", False),
+			"wavetable": wavetable,
+			"glide_table": glide_table,
+			"fade_table": fade_table,
+		}
+		fields["frequency_span"] = fields["max_frequency"] - fields["min_frequency"]
+		fields["tone_gain"] = fields["volume"] * fields["master_volume"]
+		fields["progress_gain"] = fields["tone_gain"] * PAN_BOOST_FACTOR
+		for name, value in fields.items():
+			object.__setattr__(self, name, value)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("SoundSettings is immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("SoundSettings is immutable")
+
+# Mixing priority per sound type; lower priorities are ducked while a higher one plays.
+SOUND_PRIORITIES = {
+	ERROR_WARNING: 3,
+	SOUND_EFFECTS: 2,
+	ADDON_BEEP: 1,
+	PROGRESS_INDICATOR: 0,
+}
+
 class SoundProcessor:
 
-	def __init__(self, global_plugin, pyaudio_module):
+	def __init__(self, global_plugin, pyaudio_module, output_mode=OUTPUT_CALLBACK):
 		self.global_plugin = global_plugin
 		self.pyaudio = pyaudio_module
-		self.audio_queue = queue.Queue()
+		self.channels = {
+			sound_type: PcmRingBuffer(
+				SAMPLE_RATE * RING_BUFFER_SECONDS,
+				CHANNELS,
+				SAMPLE_WIDTH,
+				policy=policy,
+				max_lag_frames=int(SAMPLE_RATE * max_lag),
+				block_timeout=block_timeout,
+				name=sound_type
+			)
+			for sound_type, (policy, max_lag, block_timeout) in CHANNEL_POLICIES.items()
+		}
+		self.audio_buffer = self.channels[PROGRESS_INDICATOR]
+		self.progress_oscillator = GlideOscillator(SAMPLE_RATE, CHANNELS, name=PROGRESS_INDICATOR)
+		self.mixer = Mixer(
+			list(self.channels.values()) + [self.progress_oscillator],
+			CHANNELS,
+			priorities=SOUND_PRIORITIES
+		)
 		self.player_thread = None
+		self.render_thread = None
+		self._render_requests = deque(maxlen=RENDER_QUEUE_LIMIT)
+		self._render_ready = threading.Event()
 		self.pa_stream = None
 		self.is_running = False
+		self.output_mode = output_mode
+		self.active_output_mode = None
+		self.latency = {mode: LatencyMeter(mode) for mode in OUTPUT_MODES}
+		self.caller_time = LatencyMeter("caller")
+		self.class_latency = {sound_type: LatencyMeter(sound_type) for sound_type in SOUND_PRIORITIES}
+		self._stop_event = threading.Event()
+		self._data_ready = threading.Event()
+		self._callback_buffer = memoryview(bytearray(CHUNK_SIZE * FRAME_BYTES))
+		self._silence = memoryview(bytes(CHUNK_SIZE * FRAME_BYTES))
 		self.last_progress_value = -1
-		self.volume = 0.5
-		self.master_volume = 1.0
-		self.fade_algorithm = "cosine"
-		self.harmonics = TONE_SINE
-		self.min_frequency = 110
-		self.max_frequency = 1760
 		self.audio_duration = 0.1
+		self.progress_interval = None
+		self._last_progress_time = None
 		self.fade_ratio = 0.5
 		self.last_update_time = time.time()
 		self.last_focus_obj = None
 		self._lock = threading.Lock()
+		self.backend = get_backend()
+		log.debug(f"SoundProcessor: Using {self.backend.name} synthesis backend")
+		self._wavetables = {}
+		self._glide_tables = {}
+		self.update_wavetables()
+		self.fade_cache = FadeEnvelopeCache()
+		self.tone_cache = ToneCache()
+		self.tone_atlas = ToneAtlas()
+		self.settings = self.build_settings({})
+		self.progress_resolver = ProgressValueResolver()
 
 		if self.pyaudio:
 			try:
@@ -71,85 +382,357 @@ class SoundProcessor:
 			if not self.pyaudio or (self.player_thread and self.player_thread.is_alive()):
 				return
 			self.is_running = True
+			self._stop_event.clear()
 			self.player_thread = threading.Thread(target=self._audio_player_loop)
 			self.player_thread.daemon = True
 			self.player_thread.start()
+			# The ring buffers and the glide oscillator take a single producer. The render thread
+			# only stops with stop_player, so after a player failure the running one is reused.
+			if not self.render_thread or not self.render_thread.is_alive():
+				self.render_thread = threading.Thread(target=self._render_loop, name="SoundAlignRender")
+				self.render_thread.daemon = True
+				self.render_thread.start()
+
+	def set_output_mode(self, output_mode):
+		if output_mode not in OUTPUT_MODES or output_mode == self.output_mode:
+			return
+		self.output_mode = output_mode
+		if self.player_thread and self.player_thread.is_alive():
+			self._stop_player()
+			self.start_player_thread()
 
-	def stop(self):
+	def _stop_player(self):
 		with self._lock:
 			self.is_running = False
-			if self.audio_queue.empty():
-				self.audio_queue.put(None)
+			self._stop_event.set()
+			self._data_ready.set()
+			self._render_ready.set()
 		if self.player_thread and self.player_thread.is_alive():
 			self.player_thread.join(timeout=1.0)
+		if self.render_thread and self.render_thread.is_alive():
+			self.render_thread.join(timeout=1.0)
 
 		with self._lock:
 			if self.pa_stream and self.pa_stream.is_active():
 				self.pa_stream.stop_stream()
 			if self.pa_stream:
 				self.pa_stream.close()
+			self.pa_stream = None
+
+	def stop(self):
+		self.tone_atlas.cancel()
+		self._stop_player()
+		with self._lock:
 			if self.pyaudio and hasattr(self, 'p'):
 				self.p.terminate()
 
+	def _open_stream(self, output_mode):
+		kwargs = {}
+		if output_mode == OUTPUT_CALLBACK:
+			kwargs["stream_callback"] = self._stream_callback
+		stream = self.p.open(
+			format=self.pyaudio.paInt16,
+			channels=CHANNELS,
+			rate=SAMPLE_RATE,
+			output=True,
+			frames_per_buffer=CHUNK_SIZE,
+			**kwargs
+		)
+		stream.start_stream()
+		self.active_output_mode = output_mode
+		return stream
+
+	def is_output_alive(self):
+		thread = self.player_thread
+		stream = self.pa_stream
+		if not self.is_running or not thread or not thread.is_alive() or not stream:
+			return False
+		try:
+			return stream.is_active()
+		except Exception:
+			return False
+
 	def _audio_player_loop(self):
+		try:
+			self._run_output()
+		finally:
+			# However the loop ends, later sounds must not be queued for a dead stream; callers
+			# fall back to the original beep until the player is restarted.
+			self.is_running = False
+
+	def _run_output(self):
 		with self._lock:
 			if not self.pyaudio:
 				return
 			try:
-				self.pa_stream = self.p.open(
-					format=self.pyaudio.paInt16,
-					channels=CHANNELS,
-					rate=SAMPLE_RATE,
-					output=True,
-					frames_per_buffer=CHUNK_SIZE
-				)
-				self.pa_stream.start_stream()
+				self.pa_stream = self._open_stream(self.output_mode)
 			except Exception as e:
-				log.error(f"SoundProcessor: Failed to open audio stream: {e}")
-				self.is_running = False
-				return
+				if self.output_mode == OUTPUT_CALLBACK:
+					log.warning(f"SoundProcessor: Callback stream unavailable ({e}), using blocking output")
+					try:
+						self.pa_stream = self._open_stream(OUTPUT_BLOCKING)
+					except Exception as e:
+						log.error(f"SoundProcessor: Failed to open audio stream: {e}")
+						self.is_running = False
+						return
+				else:
+					log.error(f"SoundProcessor: Failed to open audio stream: {e}")
+					self.is_running = False
+					return
+
+		if self.active_output_mode == OUTPUT_CALLBACK:
+			while not self._stop_event.wait(0.2):
+				stream = self.pa_stream
+				if not stream or not stream.is_active():
+					log.error("SoundProcessor: Callback stream stopped unexpectedly")
+					break
+			return
 
+		# Render a chunk only once the device queue has drained below the target depth, so
+		# write never blocks and a flush or higher priority sound is heard within a chunk or two.
+		out = memoryview(bytearray(CHUNK_SIZE * FRAME_BYTES))
+		capacity = self.pa_stream.get_write_available()
+		target = max(0, min(capacity, DEVICE_QUEUE_CHUNKS * CHUNK_SIZE) - CHUNK_SIZE)
 		while self.is_running:
 			try:
-				data = self.audio_queue.get(timeout=0.2)
-				if data is None:
+				stream = self.pa_stream
+				if not stream or not stream.is_active():
 					break
-
-				with self._lock:
-					if self.pa_stream and self.pa_stream.is_active():
-						self.pa_stream.write(data)
-					self.audio_queue.task_done()
-			except queue.Empty:
-				continue
+				queued = capacity - stream.get_write_available()
+				if queued > target:
+					self._stop_event.wait(min(queued - target, CHUNK_SIZE) / SAMPLE_RATE)
+					continue
+				size, started = self.mixer.render(out)
+				if not size:
+					self._data_ready.wait(0.2)
+					self._data_ready.clear()
+					continue
+				if started:
+					self._record_latency(OUTPUT_BLOCKING, started, stream.get_output_latency())
+				stream.write(out[:size])
 			except Exception as e:
 				log.error(f"SoundProcessor: Error in audio player loop: {e}")
 				break
 
+	def _stream_callback(self, in_data, frame_count, time_info, status):
+		needed = frame_count * FRAME_BYTES
+		out = self._callback_buffer
+		if len(out) != needed:
+			out = self._callback_buffer = memoryview(bytearray(needed))
+			self._silence = memoryview(bytes(needed))
+		size, started = self.mixer.render(out)
+		if size < needed:
+			out[size:] = self._silence[size:]
+		if started:
+			device_delay = time_info.get("output_buffer_dac_time", 0) - time_info.get("current_time", 0)
+			self._record_latency(OUTPUT_CALLBACK, started, max(device_delay, 0))
+		return (bytes(out), self.pyaudio.paContinue)
+
+	def _record_latency(self, output_mode, started, device_delay):
+		now = time.perf_counter()
+		meter = self.latency[output_mode]
+		for frame_offset, enqueue_time, sound_type in started:
+			latency = now - enqueue_time + device_delay + frame_offset / SAMPLE_RATE
+			meter.add(latency)
+			class_meter = self.class_latency.get(sound_type)
+			if class_meter is not None:
+				class_meter.add(latency)
+
 	def flush_queue(self):
-		with self._lock:
-			while not self.audio_queue.empty():
+		self._render_requests.clear()
+		for channel in self.channels.values():
+			channel.clear()
+		self.progress_oscillator.stop()
+		self.mixer.clear()
+
+	def set_priority_ducking(self, gain):
+		self.mixer.duck_gain = max(0.0, min(1.0, gain))
+
+	def set_channel_policy(self, sound_type, policy, max_lag=None, block_timeout=None):
+		channel = self.channels[sound_type]
+		channel.policy = policy
+		if max_lag is not None:
+			channel.max_lag = int(SAMPLE_RATE * max_lag) * FRAME_BYTES
+		if block_timeout is not None:
+			channel.block_timeout = block_timeout
+
+	def queue_stats(self):
+		bytes_per_ms = SAMPLE_RATE * FRAME_BYTES / 1000
+		stats = {}
+		for sound_type, channel in self.channels.items():
+			channel_stats = channel.stats()
+			channel_stats["queued_ms"] = channel_stats.pop("queued_bytes") / bytes_per_ms
+			channel_stats["high_water_ms"] = channel_stats.pop("high_water_bytes") / bytes_per_ms
+			stats[sound_type] = channel_stats
+		return stats
+
+	def play_tone(self, frequency, duration_ms, left_gain, right_gain, sound_type=None):
+		if not self.pyaudio or not self.is_running:
+			return
+		gain = self.settings.master_volume
+		self._post(
+			self._render_tone,
+			frequency,
+			duration_ms,
+			gain * left_gain,
+			gain * right_gain,
+			sound_type,
+			time.perf_counter()
+		)
+
+	def _post(self, handler, *args):
+		self._render_requests.append((handler, args))
+		self._render_ready.set()
+
+	def _render_loop(self):
+		requests = self._render_requests
+		stop_event = self._stop_event
+		while not stop_event.is_set():
+			self._render_ready.wait()
+			self._render_ready.clear()
+			while requests and not stop_event.is_set():
+				handler, args = requests.popleft()
 				try:
-					self.audio_queue.get_nowait()
-					self.audio_queue.task_done()
-				except queue.Empty:
-					break
+					handler(*args)
+				except Exception as e:
+					log.error(f"SoundProcessor: Error rendering sound: {e}")
+
+	def _render_tone(self, frequency, duration_ms, left_volume, right_volume, sound_type, enqueue_time):
+		num_samples = int(SAMPLE_RATE * duration_ms / 1000)
+		edge = min(int(SAMPLE_RATE * TONE_EDGE_SECONDS), num_samples // 2) * CHANNELS
+		data = self.backend.render_tone(
+			self._get_wavetable(TONE_SINE),
+			frequency,
+			num_samples,
+			SAMPLE_RATE,
+			left_volume,
+			right_volume,
+			self.fade_cache.get("cosine", edge)
+		)
+		channel = self.channels.get(sound_type)
+		if channel is not None and len(data) <= channel.capacity:
+			overruns = channel.overruns
+			if channel.write(data, enqueue_time):
+				self._data_ready.set()
+				return
+			if channel.overruns == overruns:
+				log.debug(f"SoundProcessor: {sound_type} sound dropped by {channel.policy} policy")
+				return
+		# Tones that are longer than their channel or overran it play as mixer voices, so a
+		# beep tones.beep would have played is never lost.
+		self.mixer.add_voice(Voice(data, sound_type=sound_type, enqueue_time=enqueue_time))
+		self._data_ready.set()
 
 	def get_progress_percent(self, obj):
 		try:
-			if obj and hasattr(obj, 'value') and obj.value:
-				match = re.search(r'(\d+)%', obj.value)
-				if match:
-					return int(match.group(1))
+			return self.progress_resolver.resolve(obj, self.settings.percent_resolution)
 		except Exception as e:
 			log.error(f"SoundProcessor: Error getting progress percent: {e}")
 		return None
 
-	def play_progress_sound(self, percent, direction):
+	def play_progress_sound(self, percent, direction, settings=None):
 		if not self.pyaudio or not self.is_running:
 			return
+		if settings is None:
+			settings = self.settings
+		now = time.perf_counter()
+		self._post(
+			self._render_progress,
+			quantize_percent(percent, settings.percent_resolution),
+			self._progress_signature(direction, settings, self._adaptive_duration(now)),
+			now
+		)
+
+	def _adaptive_duration(self, now):
+		last = self._last_progress_time
+		self._last_progress_time = now
+		if last is None or now - last > PROGRESS_IDLE_SECONDS:
+			self.progress_interval = None
+			return self.audio_duration
+		interval = now - last
+		if self.progress_interval is None:
+			self.progress_interval = interval
+		else:
+			self.progress_interval += (interval - self.progress_interval) * PROGRESS_RATE_SMOOTHING
+		if self.progress_interval >= self.audio_duration:
+			return self.audio_duration
+		steps = round(max(self.progress_interval, MIN_PROGRESS_TONE_SECONDS) / PROGRESS_TONE_STEP_SECONDS)
+		return min(self.audio_duration, round(steps * PROGRESS_TONE_STEP_SECONDS, 3))
+
+	def _render_progress(self, percent, signature, enqueue_time):
+		direction, duration, settings = signature
+		if settings.smooth_panning:
+			frequency, left_volume, right_volume = self._progress_parameters(percent, direction, settings)
+			oscillator = self.progress_oscillator
+			oscillator.set_harmonics(settings.glide_table)
+			oscillator.hold_time = duration
+			oscillator.set_target(frequency, left_volume, right_volume, enqueue_time)
+			self._data_ready.set()
+			return
+
+		data = self.tone_atlas.get(signature, percent)
+		if data is None:
+			key = (percent,) + signature
+			data = self.tone_cache.get(key)
+			if data is None:
+				data = self._render_progress_tone(percent, signature)
+				self.tone_cache.put(key, data)
+
+		if settings.overlap_progress:
+			# Consecutive tones overlap by one fade-out, a quarter of the tone at the default
+			# fade ratio, so a paced sweep takes about three quarters of its serial time.
+			overlap = self._fade_length(int(SAMPLE_RATE * duration) * CHANNELS, self.fade_ratio)
+			self.mixer.add_voice(Voice(
+				data,
+				sound_type=PROGRESS_INDICATOR,
+				enqueue_time=enqueue_time,
+				overlap=overlap - overlap % CHANNELS
+			))
+			self._data_ready.set()
+		elif self.audio_buffer.write(data, enqueue_time):
+			self._data_ready.set()
+		else:
+			log.debug(f"SoundProcessor: Progress sound dropped by {self.audio_buffer.policy} policy")
+
+	def _progress_signature(self, direction, settings, duration=None):
+		return (direction, self.audio_duration if duration is None else duration, settings)
+
+	def build_settings(self, values):
+		harmonics = WAVEFORM_MAP.get(values.get("waveformType", 0), TONE_SINE)
+		fade_length = self._fade_length(int(SAMPLE_RATE * self.audio_duration) * CHANNELS, self.fade_ratio)
+		return SoundSettings(
+			values,
+			wavetable=self._get_wavetable(harmonics),
+			glide_table=self._get_glide_table(harmonics),
+			fade_table=self.fade_cache.get(values.get("fadeAlgorithm", "cosine"), fade_length)
+		)
+
+	def apply_settings(self, values):
+		settings = self.build_settings(values)
+		self.settings = settings
+		self.set_output_mode(settings.output_mode)
+		self.invalidate_tone_cache()
+		if not settings.smooth_panning:
+			self.prewarm_progress_atlas(settings.progress_direction)
+		return settings
+
+	def invalidate_tone_cache(self):
+		self.tone_cache.clear()
+		self.tone_atlas.cancel()
+
+	def prewarm_progress_atlas(self, direction):
+		if not self.pyaudio:
+			return
+		settings = self.settings
+		signature = self._progress_signature(direction, settings)
+		self.tone_atlas.build(
+			signature,
+			lambda percent: self._render_progress_tone(percent, signature),
+			percent_grid(settings.percent_resolution)
+		)
 
-		frequency = self.min_frequency + (self.max_frequency - self.min_frequency) * (percent / 100.0)
-		samples = self._generate_tone(frequency, self.audio_duration)
+	def _progress_parameters(self, percent, direction, settings):
+		frequency = settings.min_frequency + settings.frequency_span * (percent / 100.0)
 
 		if direction == LEFT_TO_RIGHT:
 			pan = percent / 100.0
@@ -158,70 +741,48 @@ class SoundProcessor:
 		else:
 			pan = 0.5
 
-		left_volume = self.volume * (1.0 - pan) * PAN_BOOST_FACTOR * self.master_volume
-		right_volume = self.volume * pan * PAN_BOOST_FACTOR * self.master_volume
-
-		stereo_samples = array.array('h')
-		for i in range(len(samples)):
-			stereo_samples.append(int(samples[i] * left_volume))
-			stereo_samples.append(int(samples[i] * right_volume))
-
-		fade_samples = self._apply_fade(stereo_samples, self.fade_ratio)
+		return frequency, settings.progress_gain * (1.0 - pan), settings.progress_gain * pan
 
-		try:
-			self.audio_queue.put(fade_samples.tobytes())
-		except Exception as e:
-			log.error(f"SoundProcessor: Error queuing progress sound: {e}")
-
-	def _generate_tone(self, frequency, duration):
-		samples = array.array('h')
+	def _render_progress_tone(self, percent, signature):
+		direction, duration, settings = signature
+		frequency, left_volume, right_volume = self._progress_parameters(percent, direction, settings)
 		num_samples = int(SAMPLE_RATE * duration)
-
-		for i in range(num_samples):
-			t = i / SAMPLE_RATE
-			value = 0.0
-			for j, amplitude in enumerate(self.harmonics):
-				value += amplitude * math.sin(2 * math.pi * frequency * (j + 1) * t)
-			value = max(min(value, 1.0), -1.0) * 32767
-			samples.append(int(value))
-
-		return samples
-
-	def _apply_fade(self, samples, fade_ratio):
-		fade_samples = array.array('h', samples)
-		fade_length = int(len(samples) * fade_ratio / 2)
-
-		for i in range(fade_length):
-			t = i / fade_length if fade_length > 0 else 0
-
-			if self.fade_algorithm == "cosine":
-				fade = 0.5 * (1 - math.cos(math.pi * i / fade_length))
-			elif self.fade_algorithm == "gaussian":
-				fade = math.exp(-((i - fade_length) ** 2) / (2 * (fade_length / 3) ** 2))
-			elif self.fade_algorithm == "linear":
-				fade = t
-			elif self.fade_algorithm == "exponential":
-				fade = 1 - math.exp(-5 * t)
-			elif self.fade_algorithm == "logarithmic":
-				fade = math.log(1 + 9 * t) / math.log(10)
-			elif self.fade_algorithm == "s_curve":
-				fade = 1 / (1 + math.exp(-12 * (t - 0.5)))
-			elif self.fade_algorithm == "sine":
-				fade = math.sin(math.pi * t / 2)
-			elif self.fade_algorithm == "quarter_sine":
-				fade = math.sin(math.pi * t / 2)
-			elif self.fade_algorithm == "half_sine":
-				fade = (1 - math.cos(math.pi * t)) / 2
-			elif self.fade_algorithm == "square_root":
-				fade = math.sqrt(t)
-			elif self.fade_algorithm == "cubic_root":
-				fade = t ** (1/3)
-			elif self.fade_algorithm == "quadratic":
-				fade = t ** 2
-			else:
-				fade = t
-
-			fade_samples[i] = int(fade_samples[i] * fade)
-			fade_samples[-(i + 1)] = int(fade_samples[-(i + 1)] * fade)
-
-		return fade_samples
\ No newline at end of file
+		if duration == self.audio_duration:
+			envelope = settings.fade_table
+		else:
+			envelope = self.fade_cache.get(
+				settings.fade_algorithm,
+				self._fade_length(num_samples * CHANNELS, self.fade_ratio)
+			)
+
+		return self.backend.render_tone(
+			settings.wavetable,
+			frequency,
+			num_samples,
+			SAMPLE_RATE,
+			left_volume,
+			right_volume,
+			envelope
+		)
+
+	def update_wavetables(self):
+		for harmonics in HARMONIC_SETS:
+			self._get_wavetable(harmonics)
+
+	def _get_wavetable(self, harmonics):
+		key = tuple(harmonics)
+		table = self._wavetables.get(key)
+		if table is None:
+			table = self.backend.build_wavetable(key)
+			self._wavetables[key] = table
+		return table
+
+	def _get_glide_table(self, harmonics):
+		key = tuple(harmonics)
+		table = self._glide_tables.get(key)
+		if table is None:
+			table = self._glide_tables[key] = build_wavetable(key)
+		return table
+
+	def _fade_length(self, num_samples, fade_ratio):
+		return int(num_samples * fade_ratio / 2)
@@ -0,0 +1,478 @@
+# synthesis.py
+# Copyright (C) 2026 Chai Chaimee
+# Licensed under GNU General Public License. See COPYING.txt for details.
+
+import array
+import ctypes
+import math
+import operator
+import threading
+import time
+from collections import OrderedDict
+from itertools import repeat
+from logHandler import log
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# Power of two so the phase accumulator wraps cheaply; one guard point is appended
+# to every table so interpolation never has to wrap the upper index.
+WAVETABLE_SIZE = 4096
+
+FADE_CACHE_LIMIT = 32
+
+# The fast path renders a whole number of cycles whose length is within CYCLE_TOLERANCE
+# of an integer sample count (a pitch error under one cent) and repeats that block.
+MAX_CYCLE_SAMPLES = 2048
+CYCLE_TOLERANCE = 3e-4
+CYCLE_CACHE_LIMIT = 512
+
+TONE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+THREAD_PRIORITY_LOWEST = -2
+
+GLIDE_TIME = 0.03
+
+Q15_ONE = 1 << 15
+
+
+def build_wavetable(harmonics):
+	table = array.array('f', bytes(4 * (WAVETABLE_SIZE + 1)))
+	for i in range(WAVETABLE_SIZE):
+		x = 2 * math.pi * i / WAVETABLE_SIZE
+		value = 0.0
+		for j, amplitude in enumerate(harmonics):
+			if amplitude:
+				value += amplitude * math.sin(x * (j + 1))
+		table[i] = max(min(value, 1.0), -1.0) * 32767
+	table[WAVETABLE_SIZE] = table[0]
+	return table
+
+
+def render_wavetable(table, frequency, num_samples, sample_rate, phase=0.0):
+	samples = array.array('h', bytes(2 * num_samples))
+	step = frequency * WAVETABLE_SIZE / sample_rate
+	for i in range(num_samples):
+		index = int(phase)
+		a = table[index]
+		samples[i] = int(a + (table[index + 1] - a) * (phase - index))
+		phase += step
+		if phase >= WAVETABLE_SIZE:
+			phase -= WAVETABLE_SIZE
+	return samples
+
+
+def fade_gain(algorithm, i, fade_length):
+	t = i / fade_length if fade_length > 0 else 0
+
+	if algorithm == "cosine":
+		return 0.5 * (1 - math.cos(math.pi * i / fade_length))
+	elif algorithm == "gaussian":
+		return math.exp(-((i - fade_length) ** 2) / (2 * (fade_length / 3) ** 2))
+	elif algorithm == "linear":
+		return t
+	elif algorithm == "exponential":
+		return 1 - math.exp(-5 * t)
+	elif algorithm == "logarithmic":
+		return math.log(1 + 9 * t) / math.log(10)
+	elif algorithm == "s_curve":
+		return 1 / (1 + math.exp(-12 * (t - 0.5)))
+	elif algorithm == "sine":
+		return math.sin(math.pi * t / 2)
+	elif algorithm == "quarter_sine":
+		return math.sin(math.pi * t / 2)
+	elif algorithm == "half_sine":
+		return (1 - math.cos(math.pi * t)) / 2
+	elif algorithm == "square_root":
+		return math.sqrt(t)
+	elif algorithm == "cubic_root":
+		return t ** (1/3)
+	elif algorithm == "quadratic":
+		return t ** 2
+	return t
+
+
+class FadeEnvelopeCache:
+
+	def __init__(self, limit=FADE_CACHE_LIMIT):
+		self.limit = limit
+		self._envelopes = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, algorithm, fade_length):
+		key = (algorithm, fade_length)
+		with self._lock:
+			envelope = self._envelopes.get(key)
+			if envelope is not None:
+				self._envelopes.move_to_end(key)
+				return envelope
+		fade_in = array.array('f', [fade_gain(algorithm, i, fade_length) for i in range(fade_length)])
+		fade_out = array.array('f', reversed(fade_in))
+		envelope = (fade_in, fade_out)
+		with self._lock:
+			self._envelopes[key] = envelope
+			while len(self._envelopes) > self.limit:
+				self._envelopes.popitem(last=False)
+		return envelope
+
+	def clear(self):
+		with self._lock:
+			self._envelopes.clear()
+
+
+def apply_envelope(samples, fade_in, fade_out):
+	fade_length = len(fade_in)
+	if not fade_length:
+		return
+	samples[:fade_length] = array.array('h', map(int, map(operator.mul, samples[:fade_length], fade_in)))
+	samples[-fade_length:] = array.array('h', map(int, map(operator.mul, samples[-fade_length:], fade_out)))
+
+
+def mix_stereo(samples, left_gain, right_gain):
+	frames = len(samples)
+	stereo = array.array('h', bytes(4 * frames))
+	stereo[0::2] = array.array('h', map(int, map(operator.mul, samples, repeat(left_gain, frames))))
+	stereo[1::2] = array.array('h', map(int, map(operator.mul, samples, repeat(right_gain, frames))))
+	return stereo
+
+
+def to_pcm(stereo):
+	return memoryview(stereo).cast('B')
+
+
+def cycle_length(frequency, sample_rate):
+	period = sample_rate / frequency
+	best = None
+	cycles = 1
+	while best is None or cycles * period <= MAX_CYCLE_SAMPLES:
+		length = max(1, round(cycles * period))
+		error = abs(length - cycles * period) / (cycles * period)
+		if best is None or error < best[0]:
+			best = (error, cycles, length)
+		if error <= CYCLE_TOLERANCE:
+			break
+		cycles += 1
+	return best[1], best[2]
+
+
+class PythonBackend:
+	name = "python"
+
+	build_wavetable = staticmethod(build_wavetable)
+	render_wavetable = staticmethod(render_wavetable)
+	mix_stereo = staticmethod(mix_stereo)
+	apply_envelope = staticmethod(apply_envelope)
+	to_pcm = staticmethod(to_pcm)
+
+	def render_tone(self, table, frequency, num_samples, sample_rate, left_gain, right_gain, envelope):
+		samples = self.render_wavetable(table, frequency, num_samples, sample_rate)
+		stereo = self.mix_stereo(samples, left_gain, right_gain)
+		self.apply_envelope(stereo, *envelope)
+		return self.to_pcm(stereo)
+
+
+class FastPythonBackend(PythonBackend):
+	name = "python-fast"
+
+	# Gains and envelopes are applied in Q15 fixed point: an integer multiply and shift per
+	# sample is much cheaper in map than a float multiply followed by int().
+	def __init__(self):
+		self._cycles = {}
+		self._envelopes = {}
+
+	def mix_stereo(self, samples, left_gain, right_gain):
+		frames = len(samples)
+		stereo = array.array('h', bytes(4 * frames))
+		for offset, gain in ((0, left_gain), (1, right_gain)):
+			stereo[offset::2] = array.array('h', map(
+				operator.rshift,
+				map(operator.mul, samples, repeat(int(gain * Q15_ONE), frames)),
+				repeat(15, frames)
+			))
+		return stereo
+
+	def apply_envelope(self, samples, fade_in, fade_out):
+		fade_length = len(fade_in)
+		if not fade_length:
+			return
+		entry = self._envelopes.get(id(fade_in))
+		if entry is None or entry[0] is not fade_in:
+			if len(self._envelopes) >= FADE_CACHE_LIMIT:
+				self._envelopes = {}
+			entry = self._envelopes[id(fade_in)] = (
+				fade_in,
+				array.array('l', [int(gain * Q15_ONE) for gain in fade_in]),
+				array.array('l', [int(gain * Q15_ONE) for gain in fade_out])
+			)
+		samples[:fade_length] = array.array('h', map(
+			operator.rshift, map(operator.mul, samples[:fade_length], entry[1]), repeat(15, fade_length)
+		))
+		samples[-fade_length:] = array.array('h', map(
+			operator.rshift, map(operator.mul, samples[-fade_length:], entry[2]), repeat(15, fade_length)
+		))
+
+	def _stereo_cycle(self, table, frequency, sample_rate, left_gain, right_gain):
+		key = (id(table), frequency, sample_rate, left_gain, right_gain)
+		entry = self._cycles.get(key)
+		if entry is not None and entry[0] is table:
+			return entry[1]
+		cycles, length = cycle_length(frequency, sample_rate)
+		samples = self.render_wavetable(table, cycles * sample_rate / length, length, sample_rate)
+		block = self.mix_stereo(samples, left_gain, right_gain)
+		if len(self._cycles) >= CYCLE_CACHE_LIMIT:
+			self._cycles = {}
+		self._cycles[key] = (table, block)
+		return block
+
+	def render_tone(self, table, frequency, num_samples, sample_rate, left_gain, right_gain, envelope):
+		block = self._stereo_cycle(table, frequency, sample_rate, left_gain, right_gain)
+		stereo = block * (2 * num_samples // len(block) + 1)
+		del stereo[2 * num_samples:]
+		self.apply_envelope(stereo, *envelope)
+		return self.to_pcm(stereo)
+
+
+class NumpyBackend(PythonBackend):
+	name = "numpy"
+
+	def build_wavetable(self, harmonics):
+		x = numpy.arange(WAVETABLE_SIZE) * (2 * math.pi / WAVETABLE_SIZE)
+		value = numpy.zeros(WAVETABLE_SIZE)
+		for j, amplitude in enumerate(harmonics):
+			if amplitude:
+				value += amplitude * numpy.sin(x * (j + 1))
+		table = numpy.empty(WAVETABLE_SIZE + 1, dtype=numpy.float32)
+		table[:WAVETABLE_SIZE] = numpy.clip(value, -1.0, 1.0) * 32767
+		table[WAVETABLE_SIZE] = table[0]
+		return table.astype(numpy.float64)
+
+	def render_wavetable(self, table, frequency, num_samples, sample_rate, phase=0.0):
+		step = frequency * WAVETABLE_SIZE / sample_rate
+		phases = numpy.mod(phase + step * numpy.arange(num_samples), WAVETABLE_SIZE)
+		index = phases.astype(numpy.intp)
+		a = table[index]
+		return (a + (table[index + 1] - a) * (phases - index)).astype(numpy.int16)
+
+	def mix_stereo(self, samples, left_gain, right_gain):
+		stereo = numpy.empty(2 * len(samples), dtype=numpy.int16)
+		stereo[0::2] = (samples * left_gain).astype(numpy.int16)
+		stereo[1::2] = (samples * right_gain).astype(numpy.int16)
+		return stereo
+
+	def apply_envelope(self, samples, fade_in, fade_out):
+		fade_length = len(fade_in)
+		if not fade_length:
+			return
+		fade_in = numpy.frombuffer(fade_in, dtype=numpy.float32).astype(numpy.float64)
+		fade_out = numpy.frombuffer(fade_out, dtype=numpy.float32).astype(numpy.float64)
+		samples[:fade_length] = (samples[:fade_length] * fade_in).astype(numpy.int16)
+		samples[-fade_length:] = (samples[-fade_length:] * fade_out).astype(numpy.int16)
+
+
+
+def get_backend():
+	if numpy is not None:
+		return NumpyBackend()
+	return FastPythonBackend()
+
+
+class ToneCache:
+
+	def __init__(self, max_bytes=TONE_CACHE_MAX_BYTES):
+		self.max_bytes = max_bytes
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self._tones = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key):
+		with self._lock:
+			data = self._tones.get(key)
+			if data is None:
+				self.misses += 1
+				return None
+			self._tones.move_to_end(key)
+			self.hits += 1
+			return data
+
+	def put(self, key, data):
+		if len(data) > self.max_bytes:
+			return
+		with self._lock:
+			old = self._tones.pop(key, None)
+			if old is not None:
+				self.size -= len(old)
+			self._tones[key] = data
+			self.size += len(data)
+			while self.size > self.max_bytes:
+				_key, evicted = self._tones.popitem(last=False)
+				self.size -= len(evicted)
+
+	def clear(self):
+		with self._lock:
+			self._tones.clear()
+			self.size = 0
+
+	def __len__(self):
+		return len(self._tones)
+
+	def __repr__(self):
+		return (
+			f"ToneCache(tones={len(self._tones)}, bytes={self.size}/{self.max_bytes}, "
+			f"hits={self.hits}, misses={self.misses})"
+		)
+
+
+def _lower_thread_priority():
+	try:
+		kernel32 = ctypes.windll.kernel32
+		kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_LOWEST)
+	except Exception:
+		pass
+
+
+class ToneAtlas:
+
+	def __init__(self):
+		self._atlas = None
+		self._generation = 0
+		self._thread = None
+
+	def build(self, signature, render, percents=range(101)):
+		self._generation += 1
+		generation = self._generation
+		self._thread = threading.Thread(
+			target=self._build,
+			args=(generation, signature, render, tuple(percents)),
+			name="SoundAlignToneAtlas"
+		)
+		self._thread.daemon = True
+		self._thread.start()
+
+	def cancel(self):
+		self._generation += 1
+		self._atlas = None
+
+	def _build(self, generation, signature, render, percents):
+		_lower_thread_priority()
+		start = time.perf_counter()
+		chunks = []
+		offsets = {}
+		position = 0
+		try:
+			for percent in percents:
+				data = render(percent)
+				if generation != self._generation:
+					return
+				offsets[percent] = (position, position + len(data))
+				position += len(data)
+				chunks.append(data)
+				time.sleep(0)
+		except Exception as e:
+			log.error(f"SoundProcessor: Error building progress tone atlas: {e}")
+			return
+		buffer = memoryview(b"".join(chunks))
+		if generation != self._generation:
+			return
+		self._atlas = (signature, buffer, offsets)
+		log.debug(
+			f"SoundProcessor: Progress tone atlas ready ({len(offsets)} tones, {position} bytes) "
+			f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+		)
+
+	def get(self, signature, percent):
+		atlas = self._atlas
+		if atlas is None or atlas[0] != signature:
+			return None
+		span = atlas[2].get(percent)
+		if span is None:
+			return None
+		return atlas[1][span[0]:span[1]]
+
+
+class GlideOscillator:
+
+	def __init__(self, sample_rate, channels=2, glide_time=GLIDE_TIME, hold_time=0.1, name="glide"):
+		self.name = name
+		self.sample_rate = sample_rate
+		self.channels = channels
+		self.glide_time = glide_time
+		self.hold_time = hold_time
+		self.table = None
+		self.phase = 0.0
+		self.frequency = None
+		self.left = 0.0
+		self.right = 0.0
+		self.level = 0.0
+		self._target = None
+		self._last_update = None
+
+	def set_harmonics(self, table):
+		self.table = table
+
+	def set_target(self, frequency, left_gain, right_gain, timestamp):
+		self._target = (frequency, left_gain, right_gain, timestamp)
+
+	def stop(self):
+		self._target = None
+
+	def read_into(self, out):
+		table = self.table
+		target = self._target
+		if table is None or (target is None and self.level == 0.0):
+			return 0, ()
+		frames = len(out) // (2 * self.channels)
+		if not frames:
+			return 0, ()
+		started = []
+		level_target = 0.0
+		if target is not None:
+			frequency, left, right, timestamp = target
+			if timestamp != self._last_update:
+				self._last_update = timestamp
+				started.append((0, timestamp))
+			if time.perf_counter() - timestamp < self.hold_time:
+				level_target = 1.0
+			if self.level == 0.0:
+				self.frequency, self.left, self.right = frequency, left, right
+		else:
+			frequency, left, right = self.frequency, self.left, self.right
+		if level_target == 0.0 and self.level == 0.0:
+			return 0, started
+
+		# Parameters move a fixed fraction of the way to their target once per block and
+		# are ramped linearly across the block, so updates never step mid-waveform.
+		glide = 1.0 - math.exp(-frames / (self.sample_rate * self.glide_time))
+		frequency_end = self.frequency + (frequency - self.frequency) * glide
+		left_end = self.left + (left - self.left) * glide
+		right_end = self.right + (right - self.right) * glide
+		scale = WAVETABLE_SIZE / self.sample_rate
+		step = self.frequency * scale
+		step_delta = (frequency_end - self.frequency) * scale / frames
+		left_gain = self.left * self.level
+		right_gain = self.right * self.level
+		left_delta = (left_end * level_target - left_gain) / frames
+		right_delta = (right_end * level_target - right_gain) / frames
+
+		samples = array.array('h', bytes(4 * frames))
+		phase = self.phase
+		for i in range(frames):
+			index = int(phase)
+			a = table[index]
+			value = a + (table[index + 1] - a) * (phase - index)
+			samples[2 * i] = int(value * left_gain)
+			samples[2 * i + 1] = int(value * right_gain)
+			left_gain += left_delta
+			right_gain += right_delta
+			phase += step
+			step += step_delta
+			if phase >= WAVETABLE_SIZE:
+				phase -= WAVETABLE_SIZE
+		self.phase = phase
+		self.frequency, self.left, self.right = frequency_end, left_end, right_end
+		self.level = level_target
+		out[:4 * frames] = memoryview(samples).cast('B')
+		return 4 * frames, started